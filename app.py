@@ -5,14 +5,13 @@
 """
 
 import streamlit as st
-import pandas as pd
-import json
-import os
-from datetime import datetime, timedelta
-import random
+import time
+from collections import namedtuple
+from datetime import datetime
+from itertools import islice
 import numpy as np
-import folium
-from streamlit_folium import st_folium
+
+# pandas / folium 仅在部分页面使用，在对应页面函数内延迟导入以缩短冷启动时间
 
 # 页面配置
 st.set_page_config(
@@ -22,92 +21,218 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# 水质监测读数 (pH, 浊度, 溶解氧, 水温, 电导率)
+WaterQuality = namedtuple(
+    "WaterQuality", "ph turbidity dissolved_oxygen water_temp conductivity"
+)
+
+# 设备标记弹出信息模板
+_DEVICE_POPUP_TMPL = (
+    "<b>{name}</b><br>"
+    "<b>设备ID:</b> {device_id}<br>"
+    "<b>状态:</b> {status_icon} {status}<br>"
+    "<b>安装日期:</b> {install_date}<br>"
+    "<b>坐标:</b> {coords}"
+)
+
 # 简化数据加载器
 class SimpleDataLoader:
-    def __init__(self):
+    def __init__(self, seed=42):
         # 地理位置配置 (国科大深圳先进技术研究院)
         self.base_location = {"lat": 22.59163, "lng": 113.972654}
+        # 统一的随机数生成器 (固定随机种子保持一致性)
+        self._rng = np.random.default_rng(seed)
         self.load_or_generate_data()
     
     def load_or_generate_data(self):
         """加载或生成简化数据"""
-        # 13种设备类型
+        # 13种设备类型 (color为地图标记颜色，使用Folium支持的颜色)
         self.device_types = {
-            "气象站": {"icon": "🌤️", "count": 3},
-            "土壤墒情": {"icon": "🌱", "count": 5},
-            "水质监测": {"icon": "💧", "count": 1},
-            "视频监控": {"icon": "📹", "count": 4},
-            "配电柜": {"icon": "⚡", "count": 2},
-            "虫情监测": {"icon": "🐛", "count": 3},
-            "孢子仪": {"icon": "🦠", "count": 2},
-            "环境监测": {"icon": "🌡️", "count": 4},
-            "智能灌溉": {"icon": "💦", "count": 6},
-            "杀虫灯": {"icon": "💡", "count": 4},
-            "一体化闸门": {"icon": "🚪", "count": 2},
-            "积水传感器": {"icon": "🌊", "count": 3},
-            "植物生长记录仪": {"icon": "📊", "count": 3}
+            "气象站": {"icon": "🌤️", "count": 3, "color": "blue"},
+            "土壤墒情": {"icon": "🌱", "count": 5, "color": "green"},
+            "水质监测": {"icon": "💧", "count": 1, "color": "lightblue"},
+            "视频监控": {"icon": "📹", "count": 4, "color": "red"},
+            "配电柜": {"icon": "⚡", "count": 2, "color": "orange"},
+            "虫情监测": {"icon": "🐛", "count": 3, "color": "purple"},
+            "孢子仪": {"icon": "🦠", "count": 2, "color": "pink"},
+            "环境监测": {"icon": "🌡️", "count": 4, "color": "gray"},
+            "智能灌溉": {"icon": "💦", "count": 6, "color": "lightgreen"},
+            "杀虫灯": {"icon": "💡", "count": 4, "color": "beige"},
+            "一体化闸门": {"icon": "🚪", "count": 2, "color": "darkblue"},
+            "积水传感器": {"icon": "🌊", "count": 3, "color": "cadetblue"},
+            "植物生长记录仪": {"icon": "📊", "count": 3, "color": "darkgreen"}
         }
         
-        # 生成设备列表
+        # 类型查找表: 以类型编码为下标的 (类型名, 图标, 颜色)
+        self.type_table = tuple(
+            (device_type, config["icon"], config["color"])
+            for device_type, config in self.device_types.items()
+        )
+        counts = np.array([config["count"] for config in self.device_types.values()])
+        total_count = int(counts.sum())
+        # 每台设备的类型编码及其在类型内的序号 (从1开始)
+        self.type_code_arr = np.repeat(np.arange(len(self.type_table), dtype=np.int8), counts)
+        type_index = np.arange(total_count) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+        
+        # 一次性生成所有设备所需的随机数
+        # 在研究院周围1km范围内生成位置
+        offsets = self._rng.uniform(-0.01, 0.01, size=(total_count, 2))
+        lats = self.base_location["lat"] + offsets[:, 0]
+        lngs = self.base_location["lng"] + offsets[:, 1]
+        statuses = self._rng.choice(["在线", "离线"], size=total_count, p=[0.75, 0.25])
+        
+        # 设备类型/状态的数组形式，供筛选时使用布尔掩码
+        self.device_type_arr = np.array([name for name, _, _ in self.type_table])[self.type_code_arr]
+        self.status_arr = statuses
+        
+        # 生成设备列表 (所有设备共用同一个更新时间)
         self.devices = []
-        device_id = 1001
-        np.random.seed(42)  # 固定随机种子保持一致性
+        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        for device_type, config in self.device_types.items():
-            for i in range(config["count"]):
-                if device_type == "水质监测":
-                    dev_id = "865989071557605"
-                else:
-                    dev_id = f"{device_id:012d}"
-                
-                # 在研究院周围1km范围内生成位置
-                lat_offset = np.random.uniform(-0.01, 0.01)
-                lng_offset = np.random.uniform(-0.01, 0.01)
-                
-                device = {
-                    "device_id": dev_id,
-                    "device_name": f"{config['icon']} {device_type}-{i+1:02d}",
-                    "device_type": device_type,
-                    "icon": config["icon"],
-                    "status": random.choice(["在线", "在线", "在线", "离线"]),
-                    "install_date": "2024-01-15",
-                    "last_update": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "location": {
-                        "lat": self.base_location["lat"] + lat_offset,
-                        "lng": self.base_location["lng"] + lng_offset
-                    }
-                }
-                self.devices.append(device)
-                device_id += 1
+        for idx, (code, i, status, lat, lng) in enumerate(zip(
+            self.type_code_arr.tolist(), type_index.tolist(),
+            statuses.tolist(), lats.tolist(), lngs.tolist()
+        )):
+            device_type, icon, color = self.type_table[code]
+            if device_type == "水质监测":
+                dev_id = "865989071557605"
+            else:
+                dev_id = f"{1001 + idx:012d}"
+            
+            device = {
+                "device_id": dev_id,
+                "device_name": f"{icon} {device_type}-{i:02d}",
+                "device_type": device_type,
+                "icon": icon,
+                "status": status,
+                "install_date": "2024-01-15",
+                "last_update": now_str,
+                "location": {"lat": lat, "lng": lng},
+                "color": color
+            }
+            device["_card_html"] = self._device_card_html(device)
+            device["popup_html"] = _DEVICE_POPUP_TMPL.format(
+                name=device["device_name"],
+                device_id=dev_id,
+                status_icon="🟢" if status == "在线" else "🔴",
+                status=status,
+                install_date=device["install_date"],
+                coords=f"{lat:.5f}, {lng:.5f}",
+            )
+            self.devices.append(device)
+        
+        # 按类型统计 (设备数量由配置声明，无需遍历设备列表)
+        self.type_counts = {t: config["count"] for t, config in self.device_types.items()}
+        self.devices_by_type_online = {t: [] for t in self.device_types}
+        for d in self.devices:
+            if d["status"] == "在线":
+                self.devices_by_type_online[d["device_type"]].append(d)
+        self.online_counts_by_type = {
+            t: len(devices) for t, devices in self.devices_by_type_online.items()
+        }
+        
+        # 地图图例HTML (仅依赖静态的类型数量，加载时生成一次)
+        self.legend_html = (
+            '<div style="position: fixed; '
+            'top: 10px; right: 10px; width: 200px; height: auto; '
+            'background-color: white; border:2px solid grey; z-index:9999; '
+            'font-size:12px; padding: 10px;">'
+            '<h4>设备类型图例</h4>'
+            + "".join(
+                f'<p><span style="color:{color};">●</span> '
+                f'{icon} {device_type} ({self.type_counts[device_type]})</p>'
+                for device_type, icon, color in self.type_table
+            )
+            + '</div>'
+        )
         
         # 统计数据
+        online_devices = sum(self.online_counts_by_type.values())
         self.stats = {
             "total_devices": len(self.devices),
-            "online_devices": len([d for d in self.devices if d["status"] == "在线"]),
+            "online_devices": online_devices,
+            "offline_devices": len(self.devices) - online_devices,
+            "online_rate": round((online_devices / len(self.devices)) * 100, 1),
             "device_types": len(self.device_types)
         }
         
-        # 水质监测数据
+        # 水质监测数据 (pH, 浊度, 溶解氧, 水温, 电导率)
+        ph, turbidity, dissolved_oxygen, water_temp, conductivity = self._rng.uniform(
+            [6.8, 15, 6.5, 18, 180], [7.2, 25, 8.5, 25, 220]
+        ).tolist()
         self.water_quality_data = {
-            "ph": round(random.uniform(6.8, 7.2), 2),
-            "turbidity": round(random.uniform(15, 25), 1),
-            "dissolved_oxygen": round(random.uniform(6.5, 8.5), 2),
-            "water_temp": round(random.uniform(18, 25), 1),
-            "conductivity": round(random.uniform(180, 220), 0)
+            "ph": round(ph, 2),
+            "turbidity": round(turbidity, 1),
+            "dissolved_oxygen": round(dissolved_oxygen, 2),
+            "water_temp": round(water_temp, 1),
+            "conductivity": round(conductivity, 0)
+        }
+        # 基准值的数组形式，供波动计算向量化使用
+        self._wq_base = np.array(list(self.water_quality_data.values()), dtype=np.float64)
+        
+        self._generate_sim_cards()
+    
+    def _generate_sim_cards(self, n=25):
+        """生成模拟SIM卡数据 (按列批量生成) 及其汇总统计"""
+        totals = self._rng.integers(500, 2001, n)
+        used = self._rng.integers(50, (totals * 0.9).astype(int) + 1)
+        operators = self._rng.choice(["中国移动", "中国联通", "中国电信"], n)
+        statuses = self._rng.choice(["正常", "正常", "正常", "即将到期"], n)
+        card_numbers = np.char.add("898600", self._rng.integers(10**8, 10**9, n).astype("<U9"))
+        usage = np.round(used / totals * 100, 1)
+        
+        self.sim_cards = {
+            "卡号": card_numbers,
+            "运营商": operators,
+            "总流量(MB)": totals,
+            "已用(MB)": used,
+            "剩余(MB)": totals - used,
+            "使用率": usage,
+            "状态": statuses,
         }
+        self.sim_stats = {
+            "total": n,
+            "normal": int((statuses == "正常").sum()),
+            "warning": int((statuses == "即将到期").sum()),
+            "avg_usage": float(usage.mean()),
+        }
+    
+    @staticmethod
+    def _device_card_html(device):
+        """预先生成设备维护页面中可折叠卡片的HTML (原生<details>元素)"""
+        online = device["status"] == "在线"
+        status_class = "status-online" if online else "status-offline"
+        status_icon = "🟢" if online else "🔴"
+        return (
+            f'<details class="device-expander"><summary>{device["device_name"]}</summary>'
+            '<div class="device-detail">'
+            f'<div><b>设备ID</b>: {device["device_id"]}<br>'
+            f'<b>设备类型</b>: {device["device_type"]}<br>'
+            f'<b>安装日期</b>: {device["install_date"]}</div>'
+            f'<div><b>状态</b>: <span class="{status_class}">{status_icon} {device["status"]}</span><br>'
+            f'<b>最后更新</b>: {device["last_update"]}</div>'
+            '</div></details>'
+        )
+    
+    def select_devices(self, device_type=None, status=None):
+        """按类型/状态筛选设备，条件在列数组上以布尔掩码组合"""
+        mask = np.ones(len(self.devices), dtype=bool)
+        if device_type:
+            mask &= self.device_type_arr == device_type
+        if status:
+            mask &= self.status_arr == status
+        return [self.devices[i] for i in np.flatnonzero(mask)]
     
     def get_devices_by_type(self, device_type=None):
         if device_type:
-            return [d for d in self.devices if d["device_type"] == device_type]
+            return self.select_devices(device_type=device_type)
         return self.devices
     
     def get_water_quality_data(self):
-        # 添加轻微波动
-        data = self.water_quality_data.copy()
-        for key, value in data.items():
-            variation = value * 0.05  # 5%波动
-            data[key] = round(value + random.uniform(-variation, variation), 2)
-        return data
+        # 添加轻微波动 (5%波动，一次生成全部参数)
+        deltas = self._rng.uniform(-0.05, 0.05, len(self._wq_base)) * self._wq_base
+        values = np.round(self._wq_base + deltas, 2)
+        return WaterQuality(*values.tolist())
 
 # 初始化数据
 @st.cache_resource
@@ -116,9 +241,23 @@ def get_data_loader():
 
 data_loader = get_data_loader()
 
-# CSS样式
-def load_custom_css():
-    st.markdown("""
+# 水质数据快照刷新周期 (秒)
+WQ_REFRESH_SECONDS = 5
+
+@st.cache_data(ttl=WQ_REFRESH_SECONDS, max_entries=1)
+def _wq_snapshot(epoch):
+    """按刷新周期缓存水质数据，epoch变化时重新生成
+    
+    返回普通元组: WaterQuality 定义在 __main__ 中，每次重跑都会重新创建该类，
+    缓存中序列化旧类的实例会失败
+    """
+    return tuple(data_loader.get_water_quality_data())
+
+def get_water_quality_snapshot():
+    return WaterQuality(*_wq_snapshot(int(time.time() // WQ_REFRESH_SECONDS)))
+
+# CSS样式 (模块级常量，避免每次重跑重新构建)
+_CSS_HTML = """
     <style>
     .main .block-container {
         padding-top: 1rem;
@@ -135,6 +274,12 @@ def load_custom_css():
         margin-bottom: 2rem;
     }
     
+    .metric-grid {
+        display: grid;
+        grid-template-columns: repeat(4, 1fr);
+        gap: 1rem;
+    }
+    
     .metric-card {
         background: linear-gradient(135deg, #0cbf75, #059669);
         color: white;
@@ -164,6 +309,25 @@ def load_custom_css():
         margin-bottom: 1rem;
     }
     
+    .device-expander {
+        border: 1px solid #e5e7eb;
+        border-radius: 8px;
+        padding: 0.5rem 1rem;
+        margin-bottom: 0.5rem;
+    }
+    
+    .device-expander summary {
+        cursor: pointer;
+        font-weight: 600;
+    }
+    
+    .device-detail {
+        display: grid;
+        grid-template-columns: 1fr 1fr;
+        gap: 1rem;
+        line-height: 2;
+    }
+    
     .status-online {
         color: #10b981;
         font-weight: bold;
@@ -182,47 +346,70 @@ def load_custom_css():
         border-left: 4px solid #0cbf75;
     }
     </style>
-    """, unsafe_allow_html=True)
+"""
+
+def load_custom_css():
+    st.markdown(_CSS_HTML, unsafe_allow_html=True)
+
+@st.cache_data
+def _metric_grid_html(total_devices, online_devices, online_rate, device_types):
+    """构建主页顶部的4个指标卡片HTML (按统计值缓存)"""
+    cards = (
+        (total_devices, "设备总数"),
+        (online_devices, "在线设备"),
+        (f"{online_rate}%", "在线率"),
+        (device_types, "设备类型"),
+    )
+    return '<div class="metric-grid">' + "".join(
+        f'<div class="metric-card"><div class="metric-value">{value}</div>'
+        f'<div class="metric-label">{label}</div></div>'
+        for value, label in cards
+    ) + '</div>'
+
+# 水质参数展示规格: (名称, 单位, 正常范围判断, 异常提示)，顺序与 _wq_param_html 的参数一致
+_WQ_SPECS = (
+    ("pH值", "pH", lambda v: 6.5 <= v <= 7.5, "⚠️ 异常"),
+    ("浊度", "NTU", lambda v: v <= 25, "⚠️ 偏高"),
+    ("溶解氧", "mg/L", lambda v: v >= 6, "⚠️ 偏低"),
+    ("水温", "°C", lambda v: True, ""),
+    ("电导率", "μS/cm", lambda v: True, ""),
+)
+
+@st.cache_data(ttl=60, max_entries=32)
+def _wq_param_html(values):
+    """构建水质参数HTML，values为 (pH, 浊度, 溶解氧, 水温, 电导率)"""
+    parts = []
+    for (label, unit, is_normal, bad_text), value in zip(_WQ_SPECS, values):
+        color, text = ("green", "✅ 正常") if is_normal(value) else ("red", bad_text)
+        parts.append(
+            f'<div class="water-quality-param"><strong>{label}</strong>: {value} {unit} '
+            f'<small style="color: {color};">{text}</small></div>'
+        )
+    return "".join(parts)
+
+@st.fragment(run_every=f"{WQ_REFRESH_SECONDS}s")
+def _wq_panel():
+    """水质参数面板，作为独立片段定时刷新，不触发整页重跑"""
+    water_data = get_water_quality_snapshot()
+    
+    # 使用简单的参数展示
+    st.markdown(_wq_param_html(tuple(water_data)), unsafe_allow_html=True)
+    st.caption(f"数据每 {WQ_REFRESH_SECONDS} 秒自动更新")
 
 def render_main_dashboard():
     """主页仪表板"""
     st.markdown('<h2>📊 数据总览</h2>', unsafe_allow_html=True)
     
-    # 统计卡片
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{data_loader.stats['total_devices']}</div>
-            <div class="metric-label">设备总数</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{data_loader.stats['online_devices']}</div>
-            <div class="metric-label">在线设备</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        online_rate = round((data_loader.stats['online_devices'] / data_loader.stats['total_devices']) * 100, 1)
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{online_rate}%</div>
-            <div class="metric-label">在线率</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{data_loader.stats['device_types']}</div>
-            <div class="metric-label">设备类型</div>
-        </div>
-        """, unsafe_allow_html=True)
+    # 统计卡片 (单次渲染整个指标网格)
+    st.markdown(
+        _metric_grid_html(
+            data_loader.stats['total_devices'],
+            data_loader.stats['online_devices'],
+            data_loader.stats['online_rate'],
+            data_loader.stats['device_types'],
+        ),
+        unsafe_allow_html=True
+    )
     
     st.markdown("---")
     
@@ -232,53 +419,15 @@ def render_main_dashboard():
     with col1:
         st.markdown("### 💧 实时水质监测")
         st.markdown("**设备ID**: 865989071557605")
-        
-        water_data = data_loader.get_water_quality_data()
-        
-        # 使用简单的参数展示
-        st.markdown(f"""
-        <div class="water-quality-param">
-            <strong>pH值</strong>: {water_data['ph']} pH
-            <small style="color: {'green' if 6.5 <= water_data['ph'] <= 7.5 else 'red'};">
-                {'✅ 正常' if 6.5 <= water_data['ph'] <= 7.5 else '⚠️ 异常'}
-            </small>
-        </div>
-        <div class="water-quality-param">
-            <strong>浊度</strong>: {water_data['turbidity']} NTU
-            <small style="color: {'green' if water_data['turbidity'] <= 25 else 'red'};">
-                {'✅ 正常' if water_data['turbidity'] <= 25 else '⚠️ 偏高'}
-            </small>
-        </div>
-        <div class="water-quality-param">
-            <strong>溶解氧</strong>: {water_data['dissolved_oxygen']} mg/L
-            <small style="color: {'green' if water_data['dissolved_oxygen'] >= 6 else 'red'};">
-                {'✅ 正常' if water_data['dissolved_oxygen'] >= 6 else '⚠️ 偏低'}
-            </small>
-        </div>
-        <div class="water-quality-param">
-            <strong>水温</strong>: {water_data['water_temp']} °C
-            <small style="color: green;">✅ 正常</small>
-        </div>
-        <div class="water-quality-param">
-            <strong>电导率</strong>: {water_data['conductivity']} μS/cm
-            <small style="color: green;">✅ 正常</small>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        if st.button("🔄 刷新数据"):
-            st.rerun()
+        _wq_panel()
     
     with col2:
         st.markdown("### 🏭 设备分布")
         
-        # 设备类型统计
-        device_counts = {}
-        for device in data_loader.devices:
-            device_type = device["device_type"]
-            device_counts[device_type] = device_counts.get(device_type, 0) + 1
+        device_counts = data_loader.type_counts
         
         # 显示前8个设备类型
-        for i, (device_type, count) in enumerate(list(device_counts.items())[:8]):
+        for device_type, count in islice(device_counts.items(), 8):
             icon = data_loader.device_types[device_type]["icon"]
             st.write(f"{icon} **{device_type}**: {count}台")
         
@@ -300,34 +449,19 @@ def render_device_maintenance():
         status_options = ["全部", "在线", "离线"]
         selected_status = st.selectbox("设备状态", status_options)
     
-    # 筛选设备
-    filtered_devices = data_loader.devices.copy()
-    
-    if selected_type != "全部":
-        filtered_devices = [d for d in filtered_devices if d["device_type"] == selected_type]
-    
-    if selected_status != "全部":
-        filtered_devices = [d for d in filtered_devices if d["status"] == selected_status]
+    # 筛选设备 (布尔掩码组合条件，无需复制设备列表)
+    filtered_devices = data_loader.select_devices(
+        device_type=None if selected_type == "全部" else selected_type,
+        status=None if selected_status == "全部" else selected_status,
+    )
     
     st.markdown(f"**找到 {len(filtered_devices)} 个设备**")
     
-    # 设备展示
-    for device in filtered_devices:
-        status_class = "status-online" if device["status"] == "在线" else "status-offline"
-        status_icon = "🟢" if device["status"] == "在线" else "🔴"
-        
-        with st.expander(f"{device['icon']} {device['device_name']}", expanded=False):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.write(f"**设备ID**: {device['device_id']}")
-                st.write(f"**设备类型**: {device['device_type']}")
-                st.write(f"**安装日期**: {device['install_date']}")
-            
-            with col2:
-                st.markdown(f"**状态**: <span class='{status_class}'>{status_icon} {device['status']}</span>", 
-                           unsafe_allow_html=True)
-                st.write(f"**最后更新**: {device['last_update']}")
+    # 设备展示 (所有设备卡片合并为一次输出)
+    st.markdown(
+        "".join(device["_card_html"] for device in filtered_devices),
+        unsafe_allow_html=True
+    )
 
 def render_realtime_data():
     """实时数据页面"""
@@ -337,9 +471,8 @@ def render_realtime_data():
     device_types = list(data_loader.device_types.keys())
     selected_type = st.selectbox("选择设备类型", device_types)
     
-    # 获取该类型设备
-    type_devices = data_loader.get_devices_by_type(selected_type)
-    online_devices = [d for d in type_devices if d["status"] == "在线"]
+    # 获取该类型在线设备 (加载时已按类型分组)
+    online_devices = data_loader.devices_by_type_online.get(selected_type, [])
     
     if not online_devices:
         st.warning(f"该类型设备都处于离线状态")
@@ -347,6 +480,11 @@ def render_realtime_data():
     
     st.info(f"📊 {selected_type} - 共 {len(online_devices)} 台设备在线")
     
+    _realtime_device_panel(online_devices)
+
+@st.fragment(run_every=f"{WQ_REFRESH_SECONDS}s")
+def _realtime_device_panel(online_devices):
+    """实时设备指标面板，作为独立片段定时刷新"""
     # 显示设备数据
     for device in online_devices:
         with st.container():
@@ -359,8 +497,8 @@ def render_realtime_data():
             
             with col2:
                 if device["device_type"] == "水质监测":
-                    water_data = data_loader.get_water_quality_data()
-                    st.metric("pH值", f"{water_data['ph']}")
+                    water_data = get_water_quality_snapshot()
+                    st.metric("pH值", f"{water_data.ph}")
                 else:
                     # 模拟其他设备数据
                     st.metric("运行状态", "正常")
@@ -370,8 +508,103 @@ def render_realtime_data():
             
             st.markdown("---")
 
+@st.cache_resource
+def build_park_map(map_style, show_devices, show_legend):
+    """构建数字园区地图 (设备数据为静态，按地图选项缓存)"""
+    import folium
+    from folium.plugins import MarkerCluster
+    
+    center_lat = data_loader.base_location["lat"]
+    center_lng = data_loader.base_location["lng"]
+    
+    if map_style == "简化地图":
+        # 简化版地图 - 更稳定
+        m = folium.Map(
+            location=[center_lat, center_lng],
+            zoom_start=15,
+            tiles='OpenStreetMap'
+        )
+        
+        # 只添加研究院标记
+        folium.Marker(
+            [center_lat, center_lng],
+            popup="🏛️ 国科大深圳先进技术研究院<br>农业IoT示范园区",
+            tooltip="国科大深圳先进技术研究院",
+            icon=folium.Icon(color='red', icon='star')
+        ).add_to(m)
+        
+        # 添加园区边界
+        folium.Circle(
+            location=[center_lat, center_lng],
+            radius=1000,
+            popup="农业IoT示范园区",
+            color='green',
+            fillColor='lightgreen',
+            fillOpacity=0.2
+        ).add_to(m)
+        
+    else:
+        # 完整版地图
+        m = folium.Map(
+            location=[center_lat, center_lng],
+            zoom_start=16,  # 更高放大级别显示详细信息
+            tiles='OpenStreetMap'
+        )
+        
+        # 添加设备标记 (统一放入一个聚合图层，整体挂载到地图)
+        if show_devices:
+            cluster = MarkerCluster(name="设备标记")
+            for device in data_loader.devices:
+                location = device["location"]
+                folium.Marker(
+                    [location["lat"], location["lng"]],
+                    popup=folium.Popup(device["popup_html"], max_width=300),
+                    tooltip=device["device_name"],
+                    icon=folium.Icon(color=device["color"], icon='info-sign')
+                ).add_to(cluster)
+            cluster.add_to(m)
+        
+        # 添加研究院中心标记
+        folium.Marker(
+            [center_lat, center_lng],
+            popup=folium.Popup("""
+            <div style="width:250px;">
+            <h4>🏛️ 国科大深圳先进技术研究院</h4>
+            <p><b>地址:</b> 深圳市南山区西丽深圳大学城学苑大道1068号</p>
+            <p><b>农业IoT示范园区</b></p>
+            <p><b>设备总数:</b> 42台</p>
+            <p><b>坐标:</b> 22.59163°N, 113.972654°E</p>
+            </div>
+            """, max_width=300),
+            tooltip="国科大深圳先进技术研究院",
+            icon=folium.Icon(color='red', icon='star')
+        ).add_to(m)
+        
+        # 添加研究院边界 (约1km半径)
+        folium.Circle(
+            location=[center_lat, center_lng],
+            radius=1000,  # 1km半径，适合研究院规模
+            popup="农业IoT示范园区",
+            color='darkgreen',
+            fillColor='lightgreen',
+            fillOpacity=0.15,
+            weight=2,
+            dashArray='5, 5'
+        ).add_to(m)
+        
+        # 添加图例
+        if show_legend:
+            m.get_root().html.add_child(folium.Element(data_loader.legend_html))
+        
+        # 添加图层控制器
+        folium.LayerControl().add_to(m)
+    
+    return m
+
 def render_digital_park():
     """数字园区页面 - 使用真正的地图"""
+    from streamlit_folium import st_folium
+    
     st.markdown('<h2>🗺️ 数字园区</h2>', unsafe_allow_html=True)
     
     # 地图选项
@@ -392,132 +625,17 @@ def render_digital_park():
     center_lng = data_loader.base_location["lng"]
     
     try:
-        if map_style == "简化地图":
-            # 简化版地图 - 更稳定
-            m = folium.Map(
-                location=[center_lat, center_lng],
-                zoom_start=15,
-                tiles='OpenStreetMap'
-            )
-            
-            # 只添加研究院标记
-            folium.Marker(
-                [center_lat, center_lng],
-                popup="🏛️ 国科大深圳先进技术研究院<br>农业IoT示范园区",
-                tooltip="国科大深圳先进技术研究院",
-                icon=folium.Icon(color='red', icon='star')
-            ).add_to(m)
-            
-            # 添加园区边界
-            folium.Circle(
-                location=[center_lat, center_lng],
-                radius=1000,
-                popup="农业IoT示范园区",
-                color='green',
-                fillColor='lightgreen',
-                fillOpacity=0.2
-            ).add_to(m)
-            
-        else:
-            # 完整版地图
-            m = folium.Map(
-                location=[center_lat, center_lng],
-                zoom_start=16,  # 更高放大级别显示详细信息
-                tiles='OpenStreetMap'
-            )
-            
-            # 设备颜色映射 - 使用Folium支持的颜色
-            device_colors = {
-                "气象站": "blue",
-                "土壤墒情": "green", 
-                "水质监测": "lightblue",
-                "视频监控": "red",
-                "配电柜": "orange",
-                "虫情监测": "purple",
-                "孢子仪": "pink",
-                "环境监测": "gray",
-                "智能灌溉": "lightgreen",
-                "杀虫灯": "beige",
-                "一体化闸门": "darkblue",
-                "积水传感器": "cadetblue",
-                "植物生长记录仪": "darkgreen"
-            }
-            
-            # 添加设备标记
-            if show_devices:
-                for device in data_loader.devices:
-                    lat = device["location"]["lat"]
-                    lng = device["location"]["lng"]
-                    color = device_colors.get(device["device_type"], "gray")
-                    
-                    # 构建弹出信息
-                    popup_content = f"""
-                    <b>{device['icon']} {device['device_name']}</b><br>
-                    <b>设备ID:</b> {device['device_id']}<br>
-                    <b>状态:</b> {'🟢' if device['status'] == '在线' else '🔴'} {device['status']}<br>
-                    <b>安装日期:</b> {device['install_date']}<br>
-                    <b>坐标:</b> {lat:.5f}, {lng:.5f}
-                    """
-                    
-                    folium.Marker(
-                        [lat, lng],
-                        popup=folium.Popup(popup_content, max_width=300),
-                        tooltip=f"{device['icon']} {device['device_name']}",
-                        icon=folium.Icon(color=color, icon='info-sign')
-                    ).add_to(m)
-            
-            # 添加研究院中心标记
-            folium.Marker(
-                [center_lat, center_lng],
-                popup=folium.Popup("""
-                <div style="width:250px;">
-                <h4>🏛️ 国科大深圳先进技术研究院</h4>
-                <p><b>地址:</b> 深圳市南山区西丽深圳大学城学苑大道1068号</p>
-                <p><b>农业IoT示范园区</b></p>
-                <p><b>设备总数:</b> 42台</p>
-                <p><b>坐标:</b> 22.59163°N, 113.972654°E</p>
-                </div>
-                """, max_width=300),
-                tooltip="国科大深圳先进技术研究院",
-                icon=folium.Icon(color='red', icon='star')
-            ).add_to(m)
-            
-            # 添加研究院边界 (约1km半径)
-            folium.Circle(
-                location=[center_lat, center_lng],
-                radius=1000,  # 1km半径，适合研究院规模
-                popup="农业IoT示范园区",
-                color='darkgreen',
-                fillColor='lightgreen',
-                fillOpacity=0.15,
-                weight=2,
-                dashArray='5, 5'
-            ).add_to(m)
-            
-            # 添加图例
-            if show_legend:
-                legend_html = '''
-                <div style="position: fixed; 
-                            top: 10px; right: 10px; width: 200px; height: auto; 
-                            background-color: white; border:2px solid grey; z-index:9999; 
-                            font-size:12px; padding: 10px;">
-                <h4>设备类型图例</h4>
-                '''
-                
-                for device_type, color in device_colors.items():
-                    count = len([d for d in data_loader.devices if d["device_type"] == device_type])
-                    icon = data_loader.device_types[device_type]["icon"]
-                    legend_html += f'<p><span style="color:{color};">●</span> {icon} {device_type} ({count})</p>'
-                
-                legend_html += '</div>'
-                m.get_root().html.add_child(folium.Element(legend_html))
-            
-            # 添加图层控制器
-            folium.LayerControl().add_to(m)
+        m = build_park_map(map_style, show_devices, show_legend)
         
         # 显示地图
         st.markdown('<div class="map-container">', unsafe_allow_html=True)
-        map_data = st_folium(m, width=700, height=500, returned_objects=["last_object_clicked"])
+        map_data = st_folium(
+            m,
+            width=700,
+            height=500,
+            returned_objects=["last_object_clicked"],
+            key=f"park_map_{map_style}_{show_devices}_{show_legend}"
+        )
         st.markdown('</div>', unsafe_allow_html=True)
         
         # 显示点击信息
@@ -529,6 +647,7 @@ def render_digital_park():
         st.info("请刷新页面重试，或检查网络连接")
         
         # 创建简化版地图作为备选
+        import folium
         simple_map = folium.Map(
             location=[center_lat, center_lng],
             zoom_start=14,
@@ -547,26 +666,21 @@ def render_digital_park():
     
     with col1:
         st.markdown("### 📊 设备分布统计")
-        device_stats = {}
-        for device in data_loader.devices:
-            device_type = device["device_type"]
-            device_stats[device_type] = device_stats.get(device_type, 0) + 1
-        
-        for device_type, count in device_stats.items():
-            icon = data_loader.device_types[device_type]["icon"]
-            percentage = round((count / len(data_loader.devices)) * 100, 1)
-            st.write(f"{icon} **{device_type}**: {count}台 ({percentage}%)")
+        total = len(data_loader.devices)
+        st.markdown("  \n".join(
+            f"{icon} **{device_type}**: {data_loader.type_counts[device_type]}台 "
+            f"({data_loader.type_counts[device_type] / total * 100:.1f}%)"
+            for device_type, icon, _ in data_loader.type_table
+        ))
     
     with col2:
         st.markdown("### 📈 系统状态")
         
-        online_count = len([d for d in data_loader.devices if d["status"] == "在线"])
-        offline_count = len([d for d in data_loader.devices if d["status"] == "离线"])
-        
-        st.write(f"**设备总数**: {len(data_loader.devices)}台")
-        st.write(f"**在线设备**: {online_count}台")
-        st.write(f"**离线设备**: {offline_count}台") 
-        st.write(f"**在线率**: {round((online_count/len(data_loader.devices))*100, 1)}%")
+        stats = data_loader.stats
+        st.write(f"**设备总数**: {stats['total_devices']}台")
+        st.write(f"**在线设备**: {stats['online_devices']}台")
+        st.write(f"**离线设备**: {stats['offline_devices']}台")
+        st.write(f"**在线率**: {stats['online_rate']}%")
         
         # 园区信息
         st.markdown("#### 📏 园区信息")
@@ -574,50 +688,45 @@ def render_digital_park():
         st.write("**设备密度**: 13.4台/km²")
         st.write("**覆盖范围**: 1km 半径")
 
+@st.cache_resource
+def _sim_card_frame():
+    """SIM卡表格 (数据在加载时已生成，此处只构建一次DataFrame)"""
+    import pandas as pd
+    
+    return pd.DataFrame(data_loader.sim_cards)
+
 def render_sim_card_management():
     """SIM卡管理页面"""
     st.markdown('<h2>📱 流量卡管理</h2>', unsafe_allow_html=True)
     
-    # 生成模拟SIM卡数据
-    operators = ["中国移动", "中国联通", "中国电信"]
-    sim_cards = []
-    
-    for i in range(25):
-        total_data = random.randint(500, 2000)
-        used_data = random.randint(50, int(total_data * 0.9))
-        
-        card = {
-            "卡号": f"898600{random.randint(100000000, 999999999):09d}",
-            "运营商": random.choice(operators),
-            "总流量(MB)": total_data,
-            "已用(MB)": used_data,
-            "剩余(MB)": total_data - used_data,
-            "使用率": f"{round((used_data / total_data) * 100, 1)}%",
-            "状态": random.choice(["正常", "正常", "正常", "即将到期"])
-        }
-        sim_cards.append(card)
+    sim_stats = data_loader.sim_stats
     
     # 统计信息
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("SIM卡总数", len(sim_cards))
+        st.metric("SIM卡总数", sim_stats["total"])
     
     with col2:
-        normal_cards = len([c for c in sim_cards if c["状态"] == "正常"])
-        st.metric("正常状态", normal_cards)
+        st.metric("正常状态", sim_stats["normal"])
     
     with col3:
-        warning_cards = len([c for c in sim_cards if c["状态"] == "即将到期"])
-        st.metric("即将到期", warning_cards)
+        st.metric("即将到期", sim_stats["warning"])
     
     with col4:
-        avg_usage = sum([float(c["使用率"].replace('%', '')) for c in sim_cards]) / len(sim_cards)
-        st.metric("平均使用率", f"{avg_usage:.1f}%")
-    
-    # 显示SIM卡列表
-    df = pd.DataFrame(sim_cards)
-    st.dataframe(df, use_container_width=True)
+        st.metric("平均使用率", f"{sim_stats['avg_usage']:.1f}%")
+    
+    # 显示SIM卡列表 (使用率保持为数值，由column_config负责格式化)
+    st.dataframe(
+        _sim_card_frame(),
+        use_container_width=True,
+        column_config={
+            "使用率": st.column_config.ProgressColumn(
+                "使用率", format="%.1f%%", min_value=0, max_value=100
+            ),
+            "总流量(MB)": st.column_config.NumberColumn(format="%d MB"),
+        },
+    )
 
 def main():
     """主函数"""
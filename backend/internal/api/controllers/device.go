@@ -1,6 +1,7 @@
 package controllers
 
 import (
+	"encoding/json"
 	"net/http"
 	"strconv"
 	"time"
@@ -36,6 +37,64 @@ type UpdateDeviceRequest struct {
 	Config   models.JSONB `json:"config"`
 }
 
+// BulkDevicesRequest 批量查询设备请求（按主键ID或设备唯一标识）
+type BulkDevicesRequest struct {
+	IDs       []uint   `json:"ids"`
+	DeviceIDs []string `json:"device_ids"`
+}
+
+// BulkDeviceItem 批量查询结果中的单个设备及其最新数据
+type BulkDeviceItem struct {
+	Device     models.Device      `json:"device"`
+	LatestData *models.SensorData `json:"latest_data"`
+}
+
+// historyRecord NDJSON历史数据的单行记录
+type historyRecord struct {
+	Timestamp time.Time    `json:"t"`
+	Data      models.JSONB `json:"d"`
+}
+
+// columnarHistory 列式历史数据（各数组按下标对齐，缺失值为null）
+type columnarHistory struct {
+	Timestamp []time.Time              `json:"timestamp"`
+	Fields    map[string][]interface{} `json:"fields"`
+}
+
+// toColumnarHistory 将逐行的传感器数据转换为列式结构
+func toColumnarHistory(rows []models.SensorData) columnarHistory {
+	history := columnarHistory{
+		Timestamp: make([]time.Time, len(rows)),
+		Fields:    make(map[string][]interface{}),
+	}
+	for i := range rows {
+		history.Timestamp[i] = rows[i].Timestamp
+		for key, value := range rows[i].Data {
+			column, ok := history.Fields[key]
+			if !ok {
+				column = make([]interface{}, len(rows))
+				history.Fields[key] = column
+			}
+			column[i] = value
+		}
+	}
+	return history
+}
+
+// maxBulkDevices 单次批量查询的设备数量上限
+const maxBulkDevices = 500
+
+// refreshDeviceStatus 按最后通信时间重新计算设备在线状态（列表与批量查询共用）
+func refreshDeviceStatus(devices []models.Device) {
+	for i := range devices {
+		if devices[i].IsOnline() {
+			devices[i].Status = "online"
+		} else {
+			devices[i].Status = "offline"
+		}
+	}
+}
+
 // DeviceListResponse 设备列表响应
 type DeviceListResponse struct {
 	Devices []models.Device `json:"devices"`
@@ -116,13 +175,7 @@ func (ctrl *DeviceController) GetDevices(c *gin.Context) {
 	}
 	
 	// 更新设备状态（基于最后通信时间）
-	for i := range devices {
-		if devices[i].IsOnline() {
-			devices[i].Status = "online"
-		} else {
-			devices[i].Status = "offline"
-		}
-	}
+	refreshDeviceStatus(devices)
 	
 	response := DeviceListResponse{
 		Devices: devices,
@@ -174,6 +227,105 @@ func (ctrl *DeviceController) GetDevice(c *gin.Context) {
 	})
 }
 
+// GetDevicesBulk 批量获取设备及最新数据
+// @Summary 批量获取设备详情
+// @Description 一次请求返回多个设备的详情与最新传感器数据，替代逐个设备轮询
+// @Tags 设备管理
+// @Security BearerAuth
+// @Accept json
+// @Produce json
+// @Param request body BulkDevicesRequest true "设备ID列表"
+// @Success 200 {object} []BulkDeviceItem
+// @Failure 400 {object} map[string]interface{}
+// @Router /devices/bulk [post]
+func (ctrl *DeviceController) GetDevicesBulk(c *gin.Context) {
+	userID := middleware.GetUserID(c)
+	
+	var req BulkDevicesRequest
+	if err := c.ShouldBindJSON(&req); err != nil {
+		c.JSON(http.StatusBadRequest, gin.H{
+			"error": "Invalid request data",
+			"details": err.Error(),
+		})
+		return
+	}
+	
+	if len(req.IDs)+len(req.DeviceIDs) > maxBulkDevices {
+		c.JSON(http.StatusBadRequest, gin.H{
+			"error": "Too many devices requested",
+		})
+		return
+	}
+	
+	items := []BulkDeviceItem{}
+	if len(req.IDs) == 0 && len(req.DeviceIDs) == 0 {
+		c.JSON(http.StatusOK, gin.H{
+			"status": 1,
+			"data":   items,
+		})
+		return
+	}
+	
+	db := database.GetDB()
+	
+	// 一次查询取出所有匹配且属于当前用户的设备
+	var devices []models.Device
+	if err := db.Where("owner_id = ?", userID).
+		Where(db.Where("id IN ?", req.IDs).Or("device_id IN ?", req.DeviceIDs)).
+		Find(&devices).Error; err != nil {
+		c.JSON(http.StatusInternalServerError, gin.H{
+			"error": "Failed to fetch devices",
+		})
+		return
+	}
+	
+	if len(devices) == 0 {
+		c.JSON(http.StatusOK, gin.H{
+			"status": 1,
+			"data":   items,
+		})
+		return
+	}
+	
+	deviceIDs := make([]string, len(devices))
+	for i := range devices {
+		deviceIDs[i] = devices[i].DeviceID
+	}
+	
+	// 每个设备的最新一条传感器数据（PostgreSQL DISTINCT ON，一次查询）
+	var latest []models.SensorData
+	if err := db.Select("DISTINCT ON (device_id) *").
+		Where("device_id IN ?", deviceIDs).
+		Order("device_id, timestamp DESC").
+		Find(&latest).Error; err != nil {
+		c.JSON(http.StatusInternalServerError, gin.H{
+			"error": "Failed to fetch sensor data",
+		})
+		return
+	}
+	
+	latestByDevice := make(map[string]*models.SensorData, len(latest))
+	for i := range latest {
+		latestByDevice[latest[i].DeviceID] = &latest[i]
+	}
+	
+	// 与设备列表一致，按最后通信时间更新状态
+	refreshDeviceStatus(devices)
+	
+	items = make([]BulkDeviceItem, len(devices))
+	for i := range devices {
+		items[i] = BulkDeviceItem{
+			Device:     devices[i],
+			LatestData: latestByDevice[devices[i].DeviceID],
+		}
+	}
+	
+	c.JSON(http.StatusOK, gin.H{
+		"status": 1,
+		"data":   items,
+	})
+}
+
 // CreateDevice 创建设备
 // @Summary 创建新设备
 // @Description 创建一个新的IoT设备
@@ -431,6 +583,9 @@ func (ctrl *DeviceController) GetDeviceData(c *gin.Context) {
 // @Param start_time query string false "开始时间" format(date-time)
 // @Param end_time query string false "结束时间" format(date-time)
 // @Param limit query int false "数据条数限制" default(100)
+// @Param max_points query int false "降采样后的最大点数，0表示不降采样" default(0)
+// @Param field query string false "LTTB降采样依据的数值字段，缺省时等间隔抽样"
+// @Param format query string false "返回格式: ndjson按行输出{t, d}记录，columnar返回{timestamp, fields}列式数组"
 // @Success 200 {object} []models.SensorData
 // @Router /devices/{device_id}/history [get]
 func (ctrl *DeviceController) GetDeviceHistory(c *gin.Context) {
@@ -462,10 +617,20 @@ func (ctrl *DeviceController) GetDeviceHistory(c *gin.Context) {
 		}
 	}
 	
+	// 降采样参数: 请求降采样时允许读取更多原始数据，只返回max_points条
+	maxPoints, _ := strconv.Atoi(c.DefaultQuery("max_points", "0"))
+	if maxPoints > 2000 {
+		maxPoints = 2000
+	}
+	
 	// 限制数据条数
 	limit, _ := strconv.Atoi(c.DefaultQuery("limit", "100"))
-	if limit > 1000 {
-		limit = 1000
+	maxLimit := 1000
+	if maxPoints > 0 {
+		maxLimit = 10000
+	}
+	if limit > maxLimit {
+		limit = maxLimit
 	}
 	
 	var sensorData []models.SensorData
@@ -476,6 +641,38 @@ func (ctrl *DeviceController) GetDeviceHistory(c *gin.Context) {
 		return
 	}
 	
+	if maxPoints > 0 && len(sensorData) > maxPoints {
+		// LTTB按时间升序计算，结果仍按时间倒序返回
+		reverseSensorData(sensorData)
+		sensorData = downsampleSensorData(sensorData, maxPoints, c.Query("field"))
+		reverseSensorData(sensorData)
+	}
+	
+	// NDJSON格式: 每行一条紧凑记录，客户端可边接收边解析
+	if c.Query("format") == "ndjson" {
+		c.Header("Content-Type", "application/x-ndjson")
+		c.Status(http.StatusOK)
+		encoder := json.NewEncoder(c.Writer)
+		for i := range sensorData {
+			if err := encoder.Encode(historyRecord{
+				Timestamp: sensorData[i].Timestamp,
+				Data:      sensorData[i].Data,
+			}); err != nil {
+				return
+			}
+		}
+		return
+	}
+	
+	// 列式格式: 时间戳与各字段各为一个数组，不重复每行的键名
+	if c.Query("format") == "columnar" {
+		c.JSON(http.StatusOK, gin.H{
+			"status": 1,
+			"data":   toColumnarHistory(sensorData),
+		})
+		return
+	}
+	
 	c.JSON(http.StatusOK, gin.H{
 		"status": 1,
 		"data":   sensorData,
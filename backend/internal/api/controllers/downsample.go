@@ -0,0 +1,116 @@
+package controllers
+
+import (
+	"math"
+	
+	"iot-platform-backend/internal/models"
+)
+
+// downsampleSensorData 将按时间排列的传感器数据降采样到最多maxPoints条
+// 指定field且该字段在所有记录中均为数值时使用LTTB算法保留曲线形状，否则等间隔抽样
+func downsampleSensorData(rows []models.SensorData, maxPoints int, field string) []models.SensorData {
+	n := len(rows)
+	if maxPoints <= 0 || n <= maxPoints {
+		return rows
+	}
+	
+	var indices []int
+	if ys, ok := numericField(rows, field); ok && maxPoints >= 3 {
+		xs := make([]float64, n)
+		for i := range rows {
+			xs[i] = float64(rows[i].Timestamp.UnixMilli())
+		}
+		indices = lttbIndices(xs, ys, maxPoints)
+	} else {
+		indices = strideIndices(n, maxPoints)
+	}
+	
+	sampled := make([]models.SensorData, len(indices))
+	for i, idx := range indices {
+		sampled[i] = rows[idx]
+	}
+	return sampled
+}
+
+// numericField 提取每条记录中field字段的数值，任一记录缺失或非数值时返回false
+func numericField(rows []models.SensorData, field string) ([]float64, bool) {
+	if field == "" {
+		return nil, false
+	}
+	
+	ys := make([]float64, len(rows))
+	for i := range rows {
+		v, ok := rows[i].Data[field].(float64)
+		if !ok {
+			return nil, false
+		}
+		ys[i] = v
+	}
+	return ys, true
+}
+
+// strideIndices 等间隔选取m个下标，保留首尾
+func strideIndices(n, m int) []int {
+	if m == 1 {
+		return []int{n - 1}
+	}
+	
+	indices := make([]int, m)
+	step := float64(n-1) / float64(m-1)
+	for i := range indices {
+		indices[i] = int(math.Round(float64(i) * step))
+	}
+	return indices
+}
+
+// lttbIndices Largest-Triangle-Three-Buckets降采样，返回保留点的下标
+// 首尾点固定保留，中间每个桶选取与前一选中点、下一桶均值构成三角形面积最大的点
+func lttbIndices(xs, ys []float64, threshold int) []int {
+	n := len(xs)
+	indices := make([]int, 0, threshold)
+	indices = append(indices, 0)
+	
+	every := float64(n-2) / float64(threshold-2)
+	a := 0
+	for i := 0; i < threshold-2; i++ {
+		// 下一桶的均值点
+		avgStart := int(float64(i+1)*every) + 1
+		avgEnd := int(float64(i+2)*every) + 1
+		if avgEnd > n {
+			avgEnd = n
+		}
+		var avgX, avgY float64
+		for j := avgStart; j < avgEnd; j++ {
+			avgX += xs[j]
+			avgY += ys[j]
+		}
+		count := float64(avgEnd - avgStart)
+		avgX /= count
+		avgY /= count
+		
+		// 当前桶中三角形面积最大的点
+		rangeStart := int(float64(i)*every) + 1
+		rangeEnd := int(float64(i+1)*every) + 1
+		maxArea := -1.0
+		next := rangeStart
+		for j := rangeStart; j < rangeEnd; j++ {
+			area := math.Abs((xs[a]-avgX)*(ys[j]-ys[a]) - (xs[a]-xs[j])*(avgY-ys[a]))
+			if area > maxArea {
+				maxArea = area
+				next = j
+			}
+		}
+		
+		indices = append(indices, next)
+		a = next
+	}
+	
+	return append(indices, n-1)
+}
+
+// reverseSensorData 原地反转记录顺序
+func reverseSensorData(rows []models.SensorData) {
+	for i, j := 0, len(rows)-1; i < j; i, j = i+1, j-1 {
+		rows[i], rows[j] = rows[j], rows[i]
+	}
+}
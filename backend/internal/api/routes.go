@@ -53,7 +53,7 @@ func SetupRoutes(r *gin.Engine) {
 	devices := v1.Group("/devices")
 	{
 		// 公开路由
-		devices.GET("/types", deviceController.GetDeviceTypes)
+		devices.GET("/types", middleware.ETag(), deviceController.GetDeviceTypes)
 		
 		// 设备数据上报（IoT设备使用，可能需要不同的认证方式）
 		devices.POST("/:device_id/data", deviceController.PostDeviceData)
@@ -62,9 +62,10 @@ func SetupRoutes(r *gin.Engine) {
 		devicesProtected := devices.Group("")
 		devicesProtected.Use(middleware.AuthRequired())
 		{
-			devicesProtected.GET("", deviceController.GetDevices)
+			devicesProtected.GET("", middleware.ETag(), deviceController.GetDevices)
 			devicesProtected.POST("", deviceController.CreateDevice)
 			devicesProtected.GET("/stats", deviceController.GetDeviceStats)
+			devicesProtected.POST("/bulk", deviceController.GetDevicesBulk)
 			devicesProtected.GET("/:id", deviceController.GetDevice)
 			devicesProtected.PUT("/:id", deviceController.UpdateDevice)
 			devicesProtected.DELETE("/:id", deviceController.DeleteDevice)
@@ -80,7 +81,7 @@ func SetupRoutes(r *gin.Engine) {
 		projectsProtected := projects.Group("")
 		projectsProtected.Use(middleware.AuthRequired())
 		{
-			projectsProtected.GET("", projectController.GetProjects)
+			projectsProtected.GET("", middleware.ETag(), projectController.GetProjects)
 			projectsProtected.POST("", projectController.CreateProject)
 			projectsProtected.GET("/:id", projectController.GetProject)
 			projectsProtected.PUT("/:id", projectController.UpdateProject)
@@ -124,7 +125,7 @@ func SetupRoutes(r *gin.Engine) {
 	// 公开API（支持CORS，用于前端调用）
 	public := v1.Group("/public")
 	{
-		public.GET("/projects", publicProjectList)
+		public.GET("/projects", middleware.ETag(), publicProjectList)
 		public.GET("/projects/:id", publicProjectDetail)
 		public.GET("/stats", publicStats)
 	}
@@ -0,0 +1,58 @@
+package middleware
+
+import (
+	"bytes"
+	"crypto/sha256"
+	"encoding/hex"
+	"net/http"
+	
+	"github.com/gin-gonic/gin"
+)
+
+// etagWriter 缓冲响应体以便计算ETag
+type etagWriter struct {
+	gin.ResponseWriter
+	body bytes.Buffer
+}
+
+func (w *etagWriter) Write(data []byte) (int, error) {
+	return w.body.Write(data)
+}
+
+func (w *etagWriter) WriteString(s string) (int, error) {
+	return w.body.WriteString(s)
+}
+
+// ETag 条件GET中间件
+// 对成功的GET响应按响应体生成弱ETag，请求头If-None-Match匹配时返回304且不发送响应体
+func ETag() gin.HandlerFunc {
+	return func(c *gin.Context) {
+		if c.Request.Method != http.MethodGet {
+			c.Next()
+			return
+		}
+		
+		writer := &etagWriter{ResponseWriter: c.Writer}
+		c.Writer = writer
+		c.Next()
+		c.Writer = writer.ResponseWriter
+		
+		if writer.Status() != http.StatusOK {
+			c.Writer.Write(writer.body.Bytes())
+			return
+		}
+		
+		sum := sha256.Sum256(writer.body.Bytes())
+		etag := `W/"` + hex.EncodeToString(sum[:16]) + `"`
+		c.Header("ETag", etag)
+		c.Header("Cache-Control", "private, no-cache")
+		
+		if c.GetHeader("If-None-Match") == etag {
+			c.Writer.WriteHeader(http.StatusNotModified)
+			c.Writer.WriteHeaderNow()
+			return
+		}
+		
+		c.Writer.Write(writer.body.Bytes())
+	}
+}
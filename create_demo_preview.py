@@ -3,11 +3,18 @@
 创建系统演示预览
 """
 
+import matplotlib
+matplotlib.use("Agg")  # 仅输出图片，跳过GUI后端探测
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 
+OUTPUT_DIR = '/home/arc/work/ai4s/'
+# PNG使用低压缩级别: 编码更快，文件略大
+PNG_SAVE_KWARGS = {'compress_level': 1}
+
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
@@ -70,8 +77,10 @@ def create_system_architecture():
     
     plt.title('🌱 农业物联网可视化平台 v2.0 - 系统架构', fontsize=16, weight='bold', pad=20)
     plt.tight_layout()
-    plt.savefig('/home/arc/work/ai4s/system_architecture.png', dpi=300, bbox_inches='tight')
+    output_path = OUTPUT_DIR + 'system_architecture.png'
+    plt.savefig(output_path, dpi=300, bbox_inches='tight', pil_kwargs=PNG_SAVE_KWARGS)
     plt.close()
+    return output_path
 
 def create_feature_comparison():
     """创建功能对比图"""
@@ -105,8 +114,10 @@ def create_feature_comparison():
     
     plt.suptitle('🔄 系统功能对比', fontsize=16, weight='bold')
     plt.tight_layout()
-    plt.savefig('/home/arc/work/ai4s/feature_comparison.png', dpi=300, bbox_inches='tight')
+    output_path = OUTPUT_DIR + 'feature_comparison.png'
+    plt.savefig(output_path, dpi=150, bbox_inches='tight', pil_kwargs=PNG_SAVE_KWARGS)
     plt.close()
+    return output_path
 
 def create_fork_workflow():
     """创建Fork工作流程图"""
@@ -161,8 +172,10 @@ def create_fork_workflow():
     
     plt.title('🔄 Fork 功能工作流程', fontsize=16, weight='bold', pad=20)
     plt.tight_layout()
-    plt.savefig('/home/arc/work/ai4s/fork_workflow.png', dpi=300, bbox_inches='tight')
+    output_path = OUTPUT_DIR + 'fork_workflow.png'
+    plt.savefig(output_path, dpi=300, bbox_inches='tight', pil_kwargs=PNG_SAVE_KWARGS)
     plt.close()
+    return output_path
 
 def create_device_overview():
     """创建设备概览图"""
@@ -176,8 +189,8 @@ def create_device_overview():
     ]
     
     # 模拟设备数量
-    np.random.seed(42)
-    counts = np.random.randint(0, 10, len(device_types))
+    rng = np.random.default_rng(42)
+    counts = rng.integers(0, 10, len(device_types))
     counts[2] = 1  # 水质监测设备设为1，与演示数据一致
     
     # 创建饼图
@@ -196,27 +209,29 @@ def create_device_overview():
     
     ax.set_title('🏭 支持的IoT设备类型分布', fontsize=14, weight='bold', pad=20)
     plt.tight_layout()
-    plt.savefig('/home/arc/work/ai4s/device_overview.png', dpi=300, bbox_inches='tight')
+    output_path = OUTPUT_DIR + 'device_overview.png'
+    plt.savefig(output_path, dpi=150, bbox_inches='tight', pil_kwargs=PNG_SAVE_KWARGS)
     plt.close()
+    return output_path
 
 if __name__ == "__main__":
     print("🎨 创建系统演示图片...")
     
-    # 创建各种图表
-    create_system_architecture()
-    print("✅ 系统架构图已生成")
-    
-    create_feature_comparison()
-    print("✅ 功能对比图已生成")
-    
-    create_fork_workflow()
-    print("✅ Fork工作流程图已生成")
-    
-    create_device_overview()
-    print("✅ 设备概览图已生成")
+    # 各图表相互独立，并行生成
+    tasks = [
+        (create_system_architecture, "系统架构图"),
+        (create_feature_comparison, "功能对比图"),
+        (create_fork_workflow, "Fork工作流程图"),
+        (create_device_overview, "设备概览图"),
+    ]
+    with ProcessPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = {executor.submit(func): label for func, label in tasks}
+        for future in as_completed(futures):
+            future.result()
+            print(f"✅ {futures[future]}已生成")
     
     print(f"\n🎉 所有演示图片已生成完成！")
-    print("📂 图片保存位置: /home/arc/work/ai4s/")
+    print(f"📂 图片保存位置: {OUTPUT_DIR}")
     print("📋 生成的文件:")
     print("  - system_architecture.png  (系统架构图)")
     print("  - feature_comparison.png   (功能对比图)")
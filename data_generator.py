@@ -4,13 +4,80 @@
 生成真实的农业设备数据用于演示
 """
 
-import pandas as pd
+import csv
 import numpy as np
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-import json
-import random
 import os
 
+import orjson
+
+# 具有日周期规则的参数: 温度随日周期变化，湿度与温度反相关
+_TEMP_PARAMS = frozenset({"temperature", "ambient_temp", "soil_temp"})
+_HUM_PARAMS = frozenset({"humidity", "soil_humidity", "ambient_humidity"})
+
+def _param_kernel(bases, amps, signs, noise_scales, lows, highs, day_factor, noise):
+    """历史数据数值计算核，每行一个参数、每列一个小时
+
+    value = base + sign * amp * day_factor + noise_scale * noise，
+    裁剪到参数量程内并保留两位小数。noise 为 [-1, 1) 均匀分布。
+    """
+    values = bases[:, None] + (signs * amps)[:, None] * day_factor[None, :]
+    values += noise_scales[:, None] * noise
+    np.clip(values, lows[:, None], highs[:, None], out=values)
+    return np.round(values, 2, out=values)
+
+@dataclass
+class DeviceTypeSpec:
+    """设备类型的预编码参数表: 数值参数按列存为数组，枚举参数存为 (参数名, 取值) 元组"""
+    # 手写__slots__ (dataclass的slots参数需Python 3.10+)，字段均无默认值因此不冲突
+    __slots__ = ('icon', 'count', 'names', 'lows', 'highs', 'bases', 'amps', 'signs',
+                 'noise_scales', 'current_lows', 'current_highs', 'enums')
+    icon: str
+    count: int
+    names: tuple
+    lows: np.ndarray
+    highs: np.ndarray
+    bases: np.ndarray
+    amps: np.ndarray
+    signs: np.ndarray
+    noise_scales: np.ndarray
+    current_lows: np.ndarray
+    current_highs: np.ndarray
+    enums: tuple
+    
+    @classmethod
+    def from_config(cls, config):
+        """由 device_types 中的配置字典构建"""
+        parameters = config["parameters"]
+        names = tuple(param for param, spec in parameters.items() if "range" in spec)
+        lows, highs = np.array(
+            [parameters[p]["range"] for p in names], dtype=np.float64
+        ).reshape(-1, 2).T
+        spans = highs - lows
+        amps = np.zeros(len(names))
+        signs = np.zeros(len(names))
+        noise_scales = spans / 2  # 其他参数: 在量程内均匀波动
+        for k, param in enumerate(names):
+            if param in _TEMP_PARAMS:
+                # 温度有明显的日周期
+                amps[k], signs[k], noise_scales[k] = spans[k] * 0.3, 1, 2
+            elif param in _HUM_PARAMS:
+                # 湿度与温度反相关
+                amps[k], signs[k], noise_scales[k] = spans[k] * 0.2, -1, 5
+        enums = tuple(
+            (param, tuple(spec["values"])) for param, spec in parameters.items()
+            if "values" in spec
+        )
+        bases = (lows + highs) / 2
+        # 实时数据的取值区间: 默认整个量程，配置了 current_variation 时收窄到中值附近
+        current_lows, current_highs = lows, highs
+        if "current_variation" in config:
+            variation = spans * config["current_variation"]
+            current_lows, current_highs = bases - variation, bases + variation
+        return cls(config["icon"], config["count"], names, lows, highs, bases, amps,
+                   signs, noise_scales, current_lows, current_highs, enums)
+
 class AgricultureDataGenerator:
     def __init__(self):
         # 13种设备类型及其详细配置
@@ -41,6 +108,7 @@ class AgricultureDataGenerator:
                 "icon": "💧",
                 "count": 1,
                 "device_id": "865989071557605",
+                "current_variation": 0.1,  # 实时数据仅在中值 ±10% 量程内轻微波动
                 "parameters": {
                     "ph": {"range": [6.8, 7.2], "unit": "pH", "name": "pH值"},
                     "turbidity": {"range": [15, 25], "unit": "NTU", "name": "浊度"},
@@ -150,195 +218,316 @@ class AgricultureDataGenerator:
         self.base_location = {"lat": 22.59163, "lng": 113.972654}  # 深圳大学城
         self.location_spread = 0.01  # 位置散布范围 (约1km半径，适合研究院规模)
         
-    def generate_device_list(self):
-        """生成所有设备列表"""
+        # 统一的随机数生成器，按批次生成随机数
+        self._rng = np.random.default_rng()
+        # 日周期系数查找表 (按小时索引)
+        self._day_factor = np.sin(2 * np.pi * np.arange(24) / 24)
+        # 每种设备类型的预编码参数表
+        self._type_specs = {
+            device_type: DeviceTypeSpec.from_config(config)
+            for device_type, config in self.device_types.items()
+        }
+        
+    def _device_current_data(self, device_type, timestamp):
+        """生成单台在线设备的实时数据"""
+        data = {"timestamp": timestamp}
+        spec = self._type_specs[device_type]
+        
+        # 数值型参数: 按预先计算的实时取值区间一次性生成
+        if spec.names:
+            values = self._rng.uniform(spec.current_lows, spec.current_highs)
+            data.update(zip(spec.names, np.round(values, 2, out=values).tolist()))
+        
+        for param, values in spec.enums:
+            # 枚举型参数
+            data[param] = values[self._rng.integers(len(values))]
+        
+        return data
+    
+    def _generate_devices_and_current(self):
+        """单次遍历同时生成设备列表和在线设备的实时数据"""
         devices = []
-        device_id = 1001
+        current_data = {}
         
+        # 一次性生成所有设备所需的随机数
+        total_count = sum(config["count"] for config in self.device_types.values())
+        spread = self.location_spread
+        lats = (self.base_location["lat"] + self._rng.uniform(-spread, spread, total_count)).tolist()
+        lngs = (self.base_location["lng"] + self._rng.uniform(-spread, spread, total_count)).tolist()
+        online = self._rng.random(total_count) < 0.75  # 75%在线率
+        statuses = np.where(online, "在线", "离线").tolist()
+        install_days = self._rng.integers(30, 366, total_count)
+        update_minutes = self._rng.integers(1, 31, total_count)
+        
+        # 同一批次共用一个当前时间，日期字符串按数组一次性格式化
+        now = datetime.now()
+        now_iso = now.isoformat()
+        install_dates = np.datetime_as_string(
+            np.datetime64(now.date()) - install_days.astype("timedelta64[D]")
+        ).tolist()
+        last_updates = np.datetime_as_string(
+            np.datetime64(now, "us") - update_minutes.astype("timedelta64[m]"), unit="us"
+        ).tolist()
+        
+        # 设备ID整列生成 (从1001起补零到12位)，配置了固定ID的类型 (水质监测) 按区段覆盖
+        device_ids = np.char.zfill(np.arange(1001, 1001 + total_count).astype(str), 12).astype(object)
+        offset = 0
+        for config in self.device_types.values():
+            if "device_id" in config:
+                device_ids[offset:offset + config["count"]] = config["device_id"]
+            offset += config["count"]
+        device_ids = device_ids.tolist()
+        
+        idx = 0
         for device_type, config in self.device_types.items():
             for i in range(config["count"]):
-                # 特殊处理水质监测设备ID
-                if device_type == "水质监测":
-                    dev_id = config["device_id"]
-                else:
-                    dev_id = f"{device_id:012d}"
-                
+                dev_id = device_ids[idx]
                 device = {
                     "device_id": dev_id,
                     "device_name": f"{config['icon']} {device_type}-{i+1:02d}",
                     "device_type": device_type,
                     "icon": config["icon"],
                     "location": {
-                        "lat": self.base_location["lat"] + random.uniform(-self.location_spread, self.location_spread),
-                        "lng": self.base_location["lng"] + random.uniform(-self.location_spread, self.location_spread)
+                        "lat": lats[idx],
+                        "lng": lngs[idx]
                     },
-                    "status": random.choice(["在线", "在线", "在线", "离线"]),  # 80%在线率
-                    "install_date": (datetime.now() - timedelta(days=random.randint(30, 365))).strftime("%Y-%m-%d"),
-                    "last_update": (datetime.now() - timedelta(minutes=random.randint(1, 30))).isoformat(),
+                    "status": statuses[idx],
+                    "install_date": install_dates[idx],
+                    "last_update": last_updates[idx],
+                    # 监控面板直接读取 devices.json 中的参数配置, 需保留
                     "parameters": config["parameters"]
                 }
                 
                 devices.append(device)
-                device_id += 1
+                if online[idx]:
+                    current_data[dev_id] = self._device_current_data(device_type, now_iso)
+                idx += 1
                 
-        return devices
+        return devices, current_data
+    
+    def generate_device_list(self):
+        """生成所有设备列表"""
+        return self._generate_devices_and_current()[0]
     
     def generate_current_data(self, devices):
         """生成当前实时数据"""
-        current_data = {}
-        
-        for device in devices:
-            device_id = device["device_id"]
-            if device["status"] == "离线":
-                continue
-                
-            data = {"timestamp": datetime.now().isoformat()}
-            
-            for param, config in device["parameters"].items():
-                if "range" in config:
-                    # 数值型参数
-                    min_val, max_val = config["range"]
-                    if device["device_type"] == "水质监测":
-                        # 水质数据添加轻微波动
-                        base_val = (min_val + max_val) / 2
-                        variation = (max_val - min_val) * 0.1
-                        value = base_val + random.uniform(-variation, variation)
-                    else:
-                        value = random.uniform(min_val, max_val)
-                    
-                    data[param] = round(value, 2)
-                elif "values" in config:
-                    # 枚举型参数
-                    data[param] = random.choice(config["values"])
-            
-            current_data[device_id] = data
-        
-        return current_data
+        now_iso = datetime.now().isoformat()
+        return {
+            device["device_id"]: self._device_current_data(device["device_type"], now_iso)
+            for device in devices
+            if device["status"] != "离线"
+        }
     
-    def generate_historical_data(self, devices, days=7):
-        """生成历史数据"""
-        historical_data = []
+    def iter_historical_data(self, devices, days=7, chunk_hours=24):
+        """按时间分块生成历史数据，每块产出一个 列名 -> 数组 的字典 (列集合各块一致)"""
+        rng = self._rng
         
         # 生成时间序列
         end_time = datetime.now()
         start_time = end_time - timedelta(days=days)
         
         # 每小时生成一条数据
-        current_time = start_time
-        while current_time <= end_time:
-            for device in devices:
-                if random.random() > 0.95:  # 5%的数据缺失率
-                    continue
-                    
-                record = {
-                    "device_id": device["device_id"],
-                    "device_type": device["device_type"],
-                    "timestamp": current_time.isoformat(),
-                }
+        timestamps = np.arange(
+            np.datetime64(start_time, "us"), np.datetime64(end_time, "us") + 1,
+            np.timedelta64(1, "h")
+        )
+        
+        iso_times = np.datetime_as_string(timestamps, unit="us").astype(object)
+        hours = (timestamps - timestamps.astype("datetime64[D]")).astype("timedelta64[h]").astype(np.int64)
+        day_factor = self._day_factor[hours]  # 日周期
+        
+        device_ids = np.array([d["device_id"] for d in devices], dtype=object)
+        device_types = np.array([d["device_type"] for d in devices], dtype=object)
+        
+        # 所有参数列 (按设备配置顺序登记): True 为数值列, False 为枚举列
+        param_columns = {}
+        for device in devices:
+            for param, config in device["parameters"].items():
+                param_columns.setdefault(param, "range" in config)
+        
+        for chunk_start in range(0, len(timestamps), chunk_hours):
+            chunk = slice(chunk_start, chunk_start + chunk_hours)
+            n_hours = len(iso_times[chunk])
+            
+            # 行 = 保留下来的 (小时, 设备)，按时间排列，同一时刻内保持设备顺序
+            keep = rng.random((n_hours, len(devices))) <= 0.95  # 5%的数据缺失率
+            hour_idx, device_idx = np.nonzero(keep)
+            n_rows = len(hour_idx)
+            
+            # 预分配所有列 (设备没有的参数: 数值列为NaN，枚举列为None)
+            batch = {
+                "device_id": device_ids[device_idx],
+                "device_type": device_types[device_idx],
+                "timestamp": iso_times[chunk][hour_idx],
+            }
+            for param, numeric in param_columns.items():
+                if numeric:
+                    batch[param] = np.full(n_rows, np.nan)
+                else:
+                    batch[param] = np.full(n_rows, None, dtype=object)
+            
+            # 每台设备对应的行号
+            device_rows = np.split(
+                np.argsort(device_idx, kind="stable"),
+                np.cumsum(keep.sum(axis=0))[:-1]
+            )
+            
+            for device, rows in zip(devices, device_rows):
+                hours_kept = hour_idx[rows]
                 
-                # 生成参数数据
-                for param, config in device["parameters"].items():
-                    if "range" in config:
-                        min_val, max_val = config["range"]
-                        
-                        # 添加时间趋势和季节性
-                        hour = current_time.hour
-                        day_factor = np.sin(2 * np.pi * hour / 24)  # 日周期
-                        
-                        if param in ["temperature", "ambient_temp", "soil_temp"]:
-                            # 温度有明显的日周期
-                            base_val = (min_val + max_val) / 2
-                            amplitude = (max_val - min_val) * 0.3
-                            value = base_val + amplitude * day_factor + random.uniform(-2, 2)
-                        elif param in ["humidity", "soil_humidity", "ambient_humidity"]:
-                            # 湿度与温度反相关
-                            base_val = (min_val + max_val) / 2
-                            amplitude = (max_val - min_val) * 0.2
-                            value = base_val - amplitude * day_factor + random.uniform(-5, 5)
-                        else:
-                            # 其他参数正常波动
-                            value = random.uniform(min_val, max_val)
-                        
-                        record[param] = round(max(min_val, min(max_val, value)), 2)
-                    elif "values" in config:
-                        record[param] = random.choice(config["values"])
+                # 数值型参数: 按预先编码的规则表整块计算
+                spec = self._type_specs[device["device_type"]]
+                if spec.names:
+                    noise = rng.uniform(-1, 1, (len(spec.names), n_hours))
+                    block = _param_kernel(spec.bases, spec.amps, spec.signs, spec.noise_scales,
+                                          spec.lows, spec.highs, day_factor[chunk], noise)
+                    for param, values in zip(spec.names, block):
+                        batch[param][rows] = values[hours_kept]
                 
-                historical_data.append(record)
+                for param, values in spec.enums:
+                    batch[param][rows] = rng.choice(values, len(rows))
             
-            current_time += timedelta(hours=1)
+            yield batch
+    
+    def generate_historical_data(self, devices, days=7):
+        """生成历史数据 (按设备、参数整列向量化生成)，返回 列名 -> 数组 的字典"""
+        batches = list(self.iter_historical_data(devices, days))
+        return {
+            column: np.concatenate([batch[column] for batch in batches])
+            for column in batches[0]
+        }
+    
+    @staticmethod
+    def _write_json(path, obj):
+        """以UTF-8、2空格缩进写出JSON (orjson直接输出bytes，并可序列化numpy类型)"""
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    
+    @staticmethod
+    def _write_csv(path, batches):
+        """将按块产出的列数组流式写入CSV (数值列中的NaN写为空单元格)，返回写入行数"""
+        n_rows = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            for i, columns in enumerate(batches):
+                if i == 0:
+                    writer.writerow(columns.keys())
+                cells = []
+                for column in columns.values():
+                    if column.dtype.kind == "f":
+                        column = np.where(np.isnan(column), "", column.astype(str))
+                    cells.append(column.tolist())
+                writer.writerows(zip(*cells))
+                n_rows += len(columns["timestamp"])
+        return n_rows
+    
+    @staticmethod
+    def _write_parquet(path, batches):
+        """将按块产出的列数组流式写入Parquet (zstd压缩)，返回写入行数"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
         
-        return historical_data
+        n_rows = 0
+        writer = None
+        try:
+            for columns in batches:
+                if writer is None:
+                    # 由首块确定表结构: 数值列为float64，其余为字符串
+                    schema = pa.schema([
+                        (name, pa.float64() if column.dtype.kind == "f" else pa.string())
+                        for name, column in columns.items()
+                    ])
+                    writer = pq.ParquetWriter(path, schema, compression="zstd")
+                writer.write_table(pa.table(columns, schema=schema))
+                n_rows += len(columns["timestamp"])
+        finally:
+            if writer is not None:
+                writer.close()
+        return n_rows
     
     def generate_sim_card_data(self):
         """生成物联网卡数据"""
         operators = ["中国移动", "中国联通", "中国电信"]
-        card_data = []
+        n = 25  # 25张SIM卡
         
-        for i in range(25):  # 25张SIM卡
-            total_data = random.randint(500, 2000)  # MB
-            used_data = random.randint(50, int(total_data * 0.9))
-            
-            card = {
-                "card_number": f"898600{random.randint(100000000, 999999999):09d}",
-                "operator": random.choice(operators),
-                "total_data": total_data,
-                "used_data": used_data,
-                "remaining_data": total_data - used_data,
-                "usage_percent": round((used_data / total_data) * 100, 1),
-                "expire_date": (datetime.now() + timedelta(days=random.randint(30, 365))).strftime("%Y-%m-%d"),
-                "status": random.choice(["正常", "正常", "正常", "即将到期", "欠费"]),
-                "monthly_fee": random.choice([15, 20, 30, 50]),
-                "device_binding": random.choice([None, f"设备{random.randint(1001, 1050):04d}"])
-            }
-            
-            card_data.append(card)
+        # 按列批量生成随机数
+        totals = self._rng.integers(500, 2001, n)  # MB
+        used = self._rng.integers(50, (totals * 0.9).astype(np.int64) + 1)
+        card_numbers = self._rng.integers(100000000, 1000000000, n)
+        card_operators = self._rng.choice(operators, n).tolist()
+        expire_days = self._rng.integers(30, 366, n)
+        statuses = self._rng.choice(["正常", "正常", "正常", "即将到期", "欠费"], n).tolist()
+        fees = self._rng.choice([15, 20, 30, 50], n).tolist()
+        bound = self._rng.random(n) < 0.5
+        bound_ids = self._rng.integers(1001, 1051, n)
         
-        return card_data
+        # 派生列同样整列计算
+        remaining = (totals - used).tolist()
+        usage = np.round(used / totals * 100, 1).tolist()
+        numbers = np.char.add("898600", card_numbers.astype(str)).tolist()
+        expire_dates = np.datetime_as_string(
+            np.datetime64(datetime.now().date()) + expire_days.astype("timedelta64[D]")
+        ).tolist()
+        bindings = np.where(
+            bound, np.char.add("设备", bound_ids.astype(str)), None
+        ).tolist()
+        
+        return [
+            {
+                "card_number": numbers[i],
+                "operator": card_operators[i],
+                "total_data": total,
+                "used_data": used_mb,
+                "remaining_data": remaining[i],
+                "usage_percent": usage[i],
+                "expire_date": expire_dates[i],
+                "status": statuses[i],
+                "monthly_fee": fees[i],
+                "device_binding": bindings[i]
+            }
+            for i, (total, used_mb) in enumerate(zip(totals.tolist(), used.tolist()))
+        ]
     
-    def save_data(self, output_dir="data"):
-        """保存所有生成的数据到文件"""
+    def save_data(self, output_dir="data", format="csv"):
+        """保存所有生成的数据到文件 (format: 历史数据格式, "csv" 或 "parquet")"""
+        if format not in ("csv", "parquet"):
+            raise ValueError(f"不支持的历史数据格式: {format}")
         os.makedirs(output_dir, exist_ok=True)
         
-        # 生成设备列表
-        devices = self.generate_device_list()
-        with open(f"{output_dir}/devices.json", "w", encoding="utf-8") as f:
-            json.dump(devices, f, ensure_ascii=False, indent=2)
-        
-        # 生成当前数据
-        current_data = self.generate_current_data(devices)
-        with open(f"{output_dir}/current_data.json", "w", encoding="utf-8") as f:
-            json.dump(current_data, f, ensure_ascii=False, indent=2)
+        # 生成设备列表和当前数据
+        devices, current_data = self._generate_devices_and_current()
+        self._write_json(f"{output_dir}/devices.json", devices)
+        self._write_json(f"{output_dir}/current_data.json", current_data)
         
-        # 生成历史数据
-        historical_data = self.generate_historical_data(devices)
-        df_historical = pd.DataFrame(historical_data)
-        df_historical.to_csv(f"{output_dir}/historical_data.csv", index=False, encoding="utf-8")
+        # 生成历史数据 (按天分块流式写入，不在内存中保留全部记录)
+        writer = self._write_parquet if format == "parquet" else self._write_csv
+        historical_rows = writer(
+            f"{output_dir}/historical_data.{format}", self.iter_historical_data(devices)
+        )
         
         # 生成SIM卡数据
         sim_card_data = self.generate_sim_card_data()
-        with open(f"{output_dir}/sim_cards.json", "w", encoding="utf-8") as f:
-            json.dump(sim_card_data, f, ensure_ascii=False, indent=2)
+        self._write_json(f"{output_dir}/sim_cards.json", sim_card_data)
         
         # 生成统计数据
         stats = {
             "total_devices": len(devices),
-            "online_devices": len([d for d in devices if d["status"] == "在线"]),
+            "online_devices": len(current_data),  # 仅在线设备有实时数据
             "device_types": len(self.device_types),
-            "data_points": len(historical_data),
+            "data_points": historical_rows,
             "sim_cards": len(sim_card_data),
             "last_update": datetime.now().isoformat()
         }
         
-        with open(f"{output_dir}/stats.json", "w", encoding="utf-8") as f:
-            json.dump(stats, f, ensure_ascii=False, indent=2)
+        self._write_json(f"{output_dir}/stats.json", stats)
         
-        return devices, current_data, historical_data, sim_card_data, stats
+        return devices, current_data, historical_rows, sim_card_data, stats
 
 if __name__ == "__main__":
     print("🌱 生成农业物联网演示数据...")
     
     generator = AgricultureDataGenerator()
-    devices, current_data, historical_data, sim_card_data, stats = generator.save_data()
+    devices, current_data, historical_rows, sim_card_data, stats = generator.save_data()
     
     print(f"✅ 数据生成完成！")
     print(f"📊 设备总数: {stats['total_devices']}")
@@ -6,12 +6,21 @@ Go Gin + Streamlit 现代化IoT平台
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import time
-import random
+from collections import Counter
+from html import escape
+from string import Template
+from concurrent.futures import ThreadPoolExecutor
+import os
 import json
+import orjson
+
+# 缓存统计与前端共用同一实现
+from frontend.utils.cache_stats import tracked_cache, render_cache_stats
 
 # 页面配置
 st.set_page_config(
@@ -21,9 +30,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# 加载自定义CSS
-def load_custom_css():
-    st.markdown("""
+# 自定义CSS (静态内容，模块加载时构建一次)
+_CUSTOM_CSS = """
     <style>
     :root {
         --primary-color: #10B981;
@@ -181,84 +189,203 @@ def load_custom_css():
     footer {visibility: hidden;}
     header {visibility: hidden;}
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+def load_custom_css():
+    st.markdown(_CUSTOM_CSS, unsafe_allow_html=True)
+
+# 模拟数据共用的随机数生成器
+_rng = np.random.default_rng()
 
 # 模拟设备数据
-@st.cache_data
+_DEVICE_TYPES = {
+    1: {"name": "气象站", "icon": "🌤️", "color": "#3B82F6"},
+    2: {"name": "土壤墒情", "icon": "🌱", "color": "#10B981"},
+    3: {"name": "水质监测", "icon": "💧", "color": "#06B6D4"},
+    4: {"name": "视频监控", "icon": "📹", "color": "#8B5CF6"},
+    5: {"name": "配电柜", "icon": "⚡", "color": "#F59E0B"},
+    6: {"name": "虫情监测", "icon": "🐛", "color": "#EF4444"},
+    7: {"name": "孢子仪", "icon": "🦠", "color": "#84CC16"},
+    8: {"name": "环境监测", "icon": "🌡️", "color": "#6366F1"},
+    9: {"name": "智能灌溉", "icon": "💦", "color": "#14B8A6"},
+    10: {"name": "杀虫灯", "icon": "💡", "color": "#F97316"},
+    11: {"name": "一体化闸门", "icon": "🚪", "color": "#64748B"},
+    12: {"name": "积水传感器", "icon": "🌊", "color": "#0EA5E9"},
+    13: {"name": "植物生长记录仪", "icon": "📊", "color": "#22C55E"}
+}
+
+_DEVICE_TYPE_ITEMS = tuple(_DEVICE_TYPES.items())
+_DEVICE_TYPE_FILTER_OPTIONS = ["全部"] + [f"{v['icon']} {v['name']}" for v in _DEVICE_TYPES.values()]
+
 def get_device_types():
-    return {
-        1: {"name": "气象站", "icon": "🌤️", "color": "#3B82F6"},
-        2: {"name": "土壤墒情", "icon": "🌱", "color": "#10B981"},
-        3: {"name": "水质监测", "icon": "💧", "color": "#06B6D4"},
-        4: {"name": "视频监控", "icon": "📹", "color": "#8B5CF6"},
-        5: {"name": "配电柜", "icon": "⚡", "color": "#F59E0B"},
-        6: {"name": "虫情监测", "icon": "🐛", "color": "#EF4444"},
-        7: {"name": "孢子仪", "icon": "🦠", "color": "#84CC16"},
-        8: {"name": "环境监测", "icon": "🌡️", "color": "#6366F1"},
-        9: {"name": "智能灌溉", "icon": "💦", "color": "#14B8A6"},
-        10: {"name": "杀虫灯", "icon": "💡", "color": "#F97316"},
-        11: {"name": "一体化闸门", "icon": "🚪", "color": "#64748B"},
-        12: {"name": "积水传感器", "icon": "🌊", "color": "#0EA5E9"},
-        13: {"name": "植物生长记录仪", "icon": "📊", "color": "#22C55E"}
-    }
+    return _DEVICE_TYPES
+
+# 后端API配置: 设置 USE_BACKEND=1 时从 Go Gin 后端读取设备，否则使用本地模拟数据
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8080").rstrip('/')
+USE_BACKEND = os.getenv("USE_BACKEND") == "1"
+
+@st.cache_resource
+def get_http_client():
+    """进程内共享的HTTP会话，通过连接池复用到后端的TCP/TLS连接"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=3)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['Accept'] = 'application/json'
+    token = os.getenv("API_TOKEN")
+    if token:
+        session.headers['Authorization'] = f'Bearer {token}'
+    return session
+
+def fetch_backend_devices():
+    """从后端 /api/v1/devices 读取设备列表，转换为演示页面使用的结构"""
+    response = get_http_client().get(f"{API_BASE_URL}/api/v1/devices", timeout=10)
+    response.raise_for_status()
+    
+    devices = []
+    for item in response.json()['data']['devices']:
+        type_info = _DEVICE_TYPES.get(item['type'], {"name": item.get('type_name', ''), "icon": "📟", "color": "#6B7280"})
+        location = item.get('location') or {}
+        last_seen = item.get('last_seen')
+        devices.append({
+            'id': item['id'],
+            'device_id': item['device_id'],
+            'name': item['name'],
+            'type': item['type'],
+            'type_name': type_info["name"],
+            'icon': type_info["icon"],
+            'color': type_info["color"],
+            'status': item['status'],
+            'last_seen': pd.Timestamp(last_seen).to_pydatetime() if last_seen else datetime.now(),
+            'location': {'lat': location.get('lat', 0.0), 'lng': location.get('lng', 0.0)}
+        })
+    return devices
+
+@st.cache_data(ttl=5, show_spinner=False)
+def fetch_latest_device_data(device_ids):
+    """并发读取多台设备的最新传感器数据，返回 device_id -> data (无数据或失败时为None)
+
+    请求经共享会话的连接池发出，总耗时约为一次往返而非 N 次。
+    """
+    client = get_http_client()
+    
+    def fetch_one(device_id):
+        try:
+            response = client.get(f"{API_BASE_URL}/api/v1/devices/{device_id}/data", timeout=10)
+            response.raise_for_status()
+            return response.json().get('data')
+        except Exception:
+            return None
+    
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        return dict(zip(device_ids, executor.map(fetch_one, device_ids)))
 
 def generate_sample_devices():
-    device_types = get_device_types()
+    """随机生成5台演示设备 (启用后端时改为从后端读取)"""
+    if USE_BACKEND:
+        return fetch_backend_devices()
+    
+    n = 5
     devices = []
     
-    for i in range(1, 6):
-        device_type = random.choice(list(device_types.keys()))
+    # 按列批量生成随机数
+    type_idx = _rng.integers(len(_DEVICE_TYPE_ITEMS), size=n).tolist()
+    online = (_rng.random(n) < 0.5).tolist()
+    minutes_ago = _rng.integers(0, 61, size=n).tolist()
+    lats = (39.9 + _rng.uniform(-0.1, 0.1, n)).tolist()
+    lngs = (116.4 + _rng.uniform(-0.1, 0.1, n)).tolist()
+    now = datetime.now()
+    
+    for k in range(n):
+        i = k + 1
+        device_type, type_info = _DEVICE_TYPE_ITEMS[type_idx[k]]
         device = {
             'id': i,
             'device_id': f'DEV{i:03d}',
-            'name': f'{device_types[device_type]["name"]}{i:02d}',
+            'name': f'{type_info["name"]}{i:02d}',
             'type': device_type,
-            'type_name': device_types[device_type]["name"],
-            'icon': device_types[device_type]["icon"],
-            'color': device_types[device_type]["color"],
-            'status': random.choice(['online', 'offline']),
-            'last_seen': datetime.now() - timedelta(minutes=random.randint(0, 60)),
-            'location': {'lat': 39.9 + random.uniform(-0.1, 0.1), 
-                        'lng': 116.4 + random.uniform(-0.1, 0.1)}
+            'type_name': type_info["name"],
+            'icon': type_info["icon"],
+            'color': type_info["color"],
+            'status': 'online' if online[k] else 'offline',
+            'last_seen': now - timedelta(minutes=minutes_ago[k]),
+            'location': {'lat': lats[k], 'lng': lngs[k]}
         }
         devices.append(device)
     
     return devices
 
+def get_sample_devices():
+    """获取本会话的演示设备 (首次访问时生成，之后保持不变直到手动刷新)"""
+    if 'devices' not in st.session_state:
+        st.session_state.devices = generate_sample_devices()
+    return st.session_state.devices
+
+@tracked_cache(st.cache_data(ttl=60, show_spinner=False))
 def generate_sample_data(device_id, hours=24):
-    """生成模拟的传感器数据"""
-    now = datetime.now()
-    data = []
+    """生成模拟的传感器数据 (按列整体生成，返回按时间升序的DataFrame)"""
+    n = hours * 6  # 每10分钟一个数据点
+    data = {'timestamp': pd.date_range(end=datetime.now(), periods=n, freq='10min')}
+    
+    # 模拟不同类型的传感器数据
+    if device_id == 'DEV001':  # 气象站
+        data['temperature'] = np.round(20 + 10 * _rng.random(n) + 5 * (0.5 - _rng.random(n)), 1)
+        data['humidity'] = np.round(40 + 40 * _rng.random(n), 1)
+        data['wind_speed'] = np.round(_rng.uniform(0, 15, n), 1)
+    elif device_id == 'DEV002':  # 土壤墒情
+        data['soil_moisture'] = np.round(30 + 40 * _rng.random(n), 1)
+        data['soil_temperature'] = np.round(15 + 10 * _rng.random(n), 1)
+        data['ph_value'] = np.round(6.0 + 2 * _rng.random(n), 2)
+    else:  # 其他设备
+        data['value'] = np.round(50 + 50 * _rng.random(n), 1)
+        data['status'] = _rng.choice(['normal', 'warning', 'alarm'], n)
+    
+    return pd.DataFrame(data, copy=False)
+
+def downsample(df, window='30min'):
+    """按固定时间窗口 (tumbling window) 聚合传感器数据
+
+    返回以窗口起始时间为索引的DataFrame，列为 (参数, 统计量)，统计量包括 mean/min/max/count/std。
+    """
+    numeric = df.set_index('timestamp').select_dtypes('number')
+    return numeric.resample(window).agg(['mean', 'min', 'max', 'count', 'std'])
+
+def lttb_downsample(x, y, n_out=500):
+    """LTTB (Largest-Triangle-Three-Buckets) 降采样，保留曲线形状
+
+    点数不超过 n_out 时原样返回。按等间隔采样处理，以下标作为横坐标计算三角形面积。
+    """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return x, y
     
-    for i in range(hours * 6):  # 每10分钟一个数据点
-        timestamp = now - timedelta(minutes=i*10)
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    # 首尾点固定保留，中间 [1, n-1) 均分为 n_out-2 个桶
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # 下一个桶的平均点 (最后一个桶的下一个是末尾点)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = (end + next_end - 1) / 2
+        avg_y = y[end:next_end].mean()
         
-        # 模拟不同类型的传感器数据
-        if device_id == 'DEV001':  # 气象站
-            temp = 20 + 10 * random.random() + 5 * (0.5 - random.random())
-            humidity = 40 + 40 * random.random()
-            data.append({
-                'timestamp': timestamp,
-                'temperature': round(temp, 1),
-                'humidity': round(humidity, 1),
-                'wind_speed': round(random.uniform(0, 15), 1)
-            })
-        elif device_id == 'DEV002':  # 土壤墒情
-            moisture = 30 + 40 * random.random()
-            data.append({
-                'timestamp': timestamp,
-                'soil_moisture': round(moisture, 1),
-                'soil_temperature': round(15 + 10 * random.random(), 1),
-                'ph_value': round(6.0 + 2 * random.random(), 2)
-            })
-        else:  # 其他设备
-            data.append({
-                'timestamp': timestamp,
-                'value': round(50 + 50 * random.random(), 1),
-                'status': random.choice(['normal', 'warning', 'alarm'])
-            })
-    
-    return list(reversed(data))
+        candidates = np.arange(start, end)
+        areas = np.abs(
+            (prev - avg_x) * (y[candidates] - y[prev])
+            - (prev - candidates) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(areas))
+        selected[i + 1] = prev
+    
+    return x[selected], y[selected]
 
 def main():
     load_custom_css()
@@ -280,6 +407,10 @@ def main():
             key="navigation"
         )
         
+        # 侧边栏先于页面内容执行，清除后本次运行即会重新生成设备
+        if st.button("🔄 刷新设备"):
+            st.session_state.pop('devices', None)
+        
         st.markdown("---")
         st.markdown("### 🔑 演示信息")
         st.info("""
@@ -305,6 +436,62 @@ def main():
         render_realtime_data()
     elif page == "🎯 Fork演示":
         render_fork_demo()
+    
+    # 放在页面内容之后渲染，统计包含本次运行的调用
+    render_cache_stats()
+
+@tracked_cache(st.cache_data(ttl=60, show_spinner=False))
+def build_dashboard_trend_figure():
+    """仪表板气象站趋势图 (与样例数据同周期缓存，数据未变时不重建)"""
+    # 生成模拟实时数据
+    df = generate_sample_data('DEV001', 24)
+    
+    # 按30分钟窗口聚合: 折线为窗口均值，阴影带为窗口内最小/最大值
+    # 聚合后每条轨迹仅48个点，使用SVG (Scatter) 渲染，不占用浏览器有限的WebGL上下文
+    windows = downsample(df, '30min')
+    traces = []
+    for column, name, color, band_color, yaxis in (
+        ('temperature', '温度 (°C)', '#EF4444', 'rgba(239, 68, 68, 0.15)', 'y'),
+        ('humidity', '湿度 (%)', '#3B82F6', 'rgba(59, 130, 246, 0.15)', 'y2'),
+    ):
+        stats = windows[column]
+        traces += [
+            go.Scatter(
+                x=windows.index, y=stats['min'], mode='lines', line=dict(width=0),
+                yaxis=yaxis, showlegend=False, hoverinfo='skip'
+            ),
+            go.Scatter(
+                x=windows.index, y=stats['max'], mode='lines', line=dict(width=0),
+                fill='tonexty', fillcolor=band_color,
+                yaxis=yaxis, showlegend=False, hoverinfo='skip'
+            ),
+            go.Scatter(
+                x=windows.index,
+                y=stats['mean'].round(1),
+                mode='lines+markers',
+                name=name,
+                line=dict(color=color, width=2),
+                marker=dict(size=4),
+                yaxis=yaxis
+            ),
+        ]
+    
+    # 先收集轨迹，再一次性构建图表
+    fig = go.Figure(
+        data=traces,
+        layout=go.Layout(
+            title="气象站实时监控数据",
+            xaxis_title="时间",
+            yaxis=dict(title="温度 (°C)", side="left"),
+            yaxis2=dict(title="湿度 (%)", side="right", overlaying="y"),
+            hovermode='x unified',
+            showlegend=True,
+            height=400,
+            uirevision="dashboard_trend"  # 重建图表时保留用户的缩放/平移状态
+        )
+    )
+    
+    return fig
 
 def render_dashboard():
     """渲染仪表板"""
@@ -352,86 +539,56 @@ def render_dashboard():
     
     with col1:
         st.subheader("🏭 设备状态")
-        devices = generate_sample_devices()
+        devices = get_sample_devices()
         
-        for device in devices:
-            status_class = "status-online" if device['status'] == 'online' else "status-offline"
-            status_text = "在线" if device['status'] == 'online' else "离线"
-            
-            st.markdown(f"""
-            <div class="metric-card">
-                <div style="display: flex; align-items: center; justify-content: space-between;">
-                    <div>
-                        <span style="font-size: 1.5rem; margin-right: 0.5rem;">{device['icon']}</span>
-                        <strong>{device['name']}</strong>
-                        <br>
-                        <small style="color: #6B7280;">ID: {device['device_id']}</small>
-                    </div>
-                    <span class="device-status {status_class}">{status_text}</span>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+        # 设备状态以表格形式一次性发送 (Arrow格式，前端虚拟滚动)
+        status_df = pd.DataFrame({
+            'icon': [d['icon'] for d in devices],
+            'name': [d['name'] for d in devices],
+            'device_id': [d['device_id'] for d in devices],
+            'status': ["🟢 在线" if d['status'] == 'online' else "🔴 离线" for d in devices],
+            'last_seen': [d['last_seen'] for d in devices],
+        })
+        st.dataframe(
+            status_df,
+            column_config={
+                'icon': st.column_config.TextColumn("", width="small"),
+                'name': st.column_config.TextColumn("设备名称"),
+                'device_id': st.column_config.TextColumn("设备ID"),
+                'status': st.column_config.TextColumn("状态"),
+                'last_seen': st.column_config.DatetimeColumn("最后通信", format="HH:mm:ss"),
+            },
+            hide_index=True,
+            use_container_width=True
+        )
     
     with col2:
         st.subheader("📈 实时数据趋势")
         
-        # 生成模拟实时数据
-        data = generate_sample_data('DEV001', 24)
-        df = pd.DataFrame(data)
-        
-        if not df.empty:
-            fig = go.Figure()
-            
-            fig.add_trace(go.Scatter(
-                x=df['timestamp'],
-                y=df['temperature'],
-                mode='lines+markers',
-                name='温度 (°C)',
-                line=dict(color='#EF4444', width=2),
-                marker=dict(size=4)
-            ))
-            
-            fig.add_trace(go.Scatter(
-                x=df['timestamp'],
-                y=df['humidity'],
-                mode='lines+markers',
-                name='湿度 (%)',
-                line=dict(color='#3B82F6', width=2),
-                marker=dict(size=4),
-                yaxis='y2'
-            ))
-            
-            fig.update_layout(
-                title="气象站实时监控数据",
-                xaxis_title="时间",
-                yaxis=dict(title="温度 (°C)", side="left"),
-                yaxis2=dict(title="湿度 (%)", side="right", overlaying="y"),
-                hovermode='x unified',
-                showlegend=True,
-                height=400
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_dashboard_trend_figure(), use_container_width=True, key="dashboard_trend")
 
 def render_device_management():
     """渲染设备管理页面"""
     st.header("🏭 设备管理")
     
     tab1, tab2, tab3 = st.tabs(["设备列表", "添加设备", "设备统计"])
+    devices = get_sample_devices()  # 列表与统计共用同一批设备
     
     with tab1:
         st.subheader("设备列表")
-        devices = generate_sample_devices()
         
         # 筛选器
         col1, col2, col3 = st.columns(3)
         with col1:
             status_filter = st.selectbox("状态筛选", ["全部", "在线", "离线"])
         with col2:
-            type_filter = st.selectbox("类型筛选", ["全部"] + [f"{v['icon']} {v['name']}" for v in get_device_types().values()])
+            type_filter = st.selectbox("类型筛选", _DEVICE_TYPE_FILTER_OPTIONS)
         with col3:
             st.write("")  # 占位符
         
+        # 启用后端时一次并发拉取所有设备的最新数据
+        latest_data = fetch_latest_device_data(tuple(d['device_id'] for d in devices)) if USE_BACKEND else {}
+        
         # 设备表格
         for device in devices:
             with st.expander(f"{device['icon']} {device['name']} - {device['device_id']}", expanded=False):
@@ -446,6 +603,10 @@ def render_device_management():
                 with col2:
                     st.write(f"**最后通信:** {device['last_seen'].strftime('%Y-%m-%d %H:%M:%S')}")
                     st.write(f"**位置:** {device['location']['lat']:.3f}, {device['location']['lng']:.3f}")
+                    latest = latest_data.get(device['device_id'])
+                    if latest:
+                        st.write(f"**最新数据:** {latest.get('timestamp', '')}")
+                        st.json(latest.get('data') or {}, expanded=False)
                 
                 with col3:
                     if st.button(f"查看详情", key=f"detail_{device['id']}"):
@@ -463,8 +624,8 @@ def render_device_management():
             with col1:
                 device_id = st.text_input("设备ID", placeholder="例：DEV006")
                 device_name = st.text_input("设备名称", placeholder="例：温室气象站")
-                device_type = st.selectbox("设备类型", options=list(get_device_types().keys()),
-                                         format_func=lambda x: f"{get_device_types()[x]['icon']} {get_device_types()[x]['name']}")
+                device_type = st.selectbox("设备类型", options=list(_DEVICE_TYPES),
+                                         format_func=lambda x: f"{_DEVICE_TYPES[x]['icon']} {_DEVICE_TYPES[x]['name']}")
             
             with col2:
                 location_lat = st.number_input("纬度", value=39.9042)
@@ -480,39 +641,63 @@ def render_device_management():
     with tab3:
         st.subheader("设备统计")
         
-        device_types = get_device_types()
-        devices = generate_sample_devices()
-        
-        # 按类型统计
-        type_counts = {}
-        for device in devices:
-            type_name = device['type_name']
-            if type_name not in type_counts:
-                type_counts[type_name] = {'total': 0, 'online': 0}
-            type_counts[type_name]['total'] += 1
-            if device['status'] == 'online':
-                type_counts[type_name]['online'] += 1
+        # 设备类型及状态不变时复用上次构建的饼图和统计表
+        devices_key = hash(tuple((d['device_id'], d['type'], d['status']) for d in devices))
+        if st.session_state.get('stats_df_hash') != devices_key:
+            # 按类型统计
+            total = Counter(d['type_name'] for d in devices)
+            online = Counter(d['type_name'] for d in devices if d['status'] == 'online')
+            type_counts = {name: {'total': count, 'online': online[name]} for name, count in total.items()}
+            
+            # 饼图
+            labels = list(type_counts.keys())
+            values = [type_counts[label]['total'] for label in labels]
+            
+            fig = px.pie(values=values, names=labels, title="设备类型分布")
+            fig.update_traces(textposition='inside', textinfo='percent+label')
+            
+            st.session_state['stats_pie'] = fig
+            st.session_state['stats_df'] = build_device_stats_frame(type_counts)
+            st.session_state['stats_df_hash'] = devices_key
         
-        # 饼图
-        labels = list(type_counts.keys())
-        values = [type_counts[label]['total'] for label in labels]
-        
-        fig = px.pie(values=values, names=labels, title="设备类型分布")
-        fig.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(st.session_state['stats_pie'], use_container_width=True, key="device_type_pie")
         
         # 统计表格
-        stats_data = []
-        for type_name, counts in type_counts.items():
-            stats_data.append({
-                "设备类型": type_name,
-                "总数": counts['total'],
-                "在线": counts['online'],
-                "离线": counts['total'] - counts['online'],
-                "在线率": f"{counts['online']/counts['total']*100:.1f}%"
-            })
-        
-        st.dataframe(pd.DataFrame(stats_data), use_container_width=True)
+        st.dataframe(st.session_state['stats_df'], use_container_width=True)
+
+def build_device_stats_frame(type_counts):
+    """由 类型 -> {total, online} 计数构建设备统计表 (整列计算)"""
+    counts = np.array([[c['total'], c['online']] for c in type_counts.values()], dtype=np.int64).reshape(-1, 2)
+    totals, online = counts[:, 0], counts[:, 1]
+    rates = np.divide(online * 100, totals, out=np.zeros(len(totals)), where=totals > 0)
+    return pd.DataFrame({
+        "设备类型": list(type_counts),
+        "总数": totals,
+        "在线": online,
+        "离线": totals - online,
+        "在线率": pd.Series(rates).map("{:.1f}%".format),
+    })
+
+# 项目卡片模板 (模块加载时编译一次)
+_PROJECT_CARD_TMPL = Template(
+    '$separator<div class="project-card">$fork_button'
+    '<div class="project-title">$name</div>'
+    '<div class="project-description">$description</div>'
+    '<div style="margin-bottom: 1rem;">$tags</div>'
+    '<div class="project-stats">$stats</div>'
+    '</div>'
+)
+
+def project_card_html(project, stats, separator=False, fork_button=False):
+    """渲染项目卡片HTML，项目名称、描述、标签等文本字段统一做HTML转义"""
+    return _PROJECT_CARD_TMPL.substitute(
+        separator="<hr>" if separator else "",
+        fork_button='<button class="fork-button">🔄 Fork</button>' if fork_button else "",
+        name=escape(project['name']),
+        description=escape(project['description']),
+        tags="".join(f'<span class="project-tag">{escape(tag)}</span>' for tag in project['tags']),
+        stats="".join(f'<span>{escape(str(item))}</span>' for item in stats),
+    )
 
 def render_project_management():
     """渲染项目管理页面"""
@@ -549,22 +734,14 @@ def render_project_management():
             }
         ]
         
-        for project in my_projects:
-            st.markdown(f"""
-            <div class="project-card">
-                <div class="project-title">{project['name']}</div>
-                <div class="project-description">{project['description']}</div>
-                <div style="margin-bottom: 1rem;">
-                    {''.join([f'<span class="project-tag">{tag}</span>' for tag in project['tags']])}
-                </div>
-                <div class="project-stats">
-                    <span>⭐ {project['stars']}</span>
-                    <span>🔄 {project['forks']}</span>
-                    <span>📅 {project['updated_at']}</span>
-                    <span>{'🌍 公开' if project['public'] else '🔒 私有'}</span>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+        for i, project in enumerate(my_projects):
+            # 与上一个项目之间的分隔线并入卡片HTML，每个项目只发送一次markdown
+            st.markdown(project_card_html(project, [
+                f"⭐ {project['stars']}",
+                f"🔄 {project['forks']}",
+                f"📅 {project['updated_at']}",
+                '🌍 公开' if project['public'] else '🔒 私有',
+            ], separator=i > 0), unsafe_allow_html=True)
             
             col1, col2, col3, col4 = st.columns(4)
             with col1:
@@ -579,8 +756,9 @@ def render_project_management():
             with col4:
                 if st.button("删除", key=f"delete_my_{project['id']}"):
                     st.warning("确认删除此项目？")
-            
-            st.markdown("---")
+        
+        # 最后一个项目之后的分隔线
+        st.markdown("---")
     
     with tab2:
         st.subheader("公开项目")
@@ -622,23 +800,14 @@ def render_project_management():
             }
         ]
         
-        for project in public_projects:
-            st.markdown(f"""
-            <div class="project-card">
-                <button class="fork-button">🔄 Fork</button>
-                <div class="project-title">{project['name']}</div>
-                <div class="project-description">{project['description']}</div>
-                <div style="margin-bottom: 1rem;">
-                    {''.join([f'<span class="project-tag">{tag}</span>' for tag in project['tags']])}
-                </div>
-                <div class="project-stats">
-                    <span>👤 {project['author']}</span>
-                    <span>⭐ {project['stars']}</span>
-                    <span>🔄 {project['forks']}</span>
-                    <span>📅 {project['updated_at']}</span>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+        for i, project in enumerate(public_projects):
+            # 与上一个项目之间的分隔线并入卡片HTML，每个项目只发送一次markdown
+            st.markdown(project_card_html(project, [
+                f"👤 {project['author']}",
+                f"⭐ {project['stars']}",
+                f"🔄 {project['forks']}",
+                f"📅 {project['updated_at']}",
+            ], separator=i > 0, fork_button=True), unsafe_allow_html=True)
             
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -650,8 +819,9 @@ def render_project_management():
             with col3:
                 if st.button("🔄 Fork", key=f"fork_public_{project['id']}"):
                     show_fork_dialog(project)
-            
-            st.markdown("---")
+        
+        # 最后一个项目之后的分隔线
+        st.markdown("---")
     
     with tab3:
         st.subheader("创建新项目")
@@ -719,81 +889,150 @@ def render_realtime_data():
     """渲染实时数据页面"""
     st.header("📈 实时数据监控")
     
-    # 实时数据更新
-    placeholder = st.empty()
-    
     if st.checkbox("启用实时更新", value=True):
-        # 模拟实时数据流
-        for i in range(10):
-            with placeholder.container():
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.subheader("🌤️ 气象数据")
-                    
-                    # 生成随机数据
-                    temp = 20 + 10 * random.random()
-                    humidity = 40 + 40 * random.random()
-                    wind_speed = random.uniform(0, 15)
-                    
-                    # 显示实时数值
-                    col1a, col1b, col1c = st.columns(3)
-                    with col1a:
-                        st.metric("温度", f"{temp:.1f}°C", f"{random.uniform(-1, 1):.1f}")
-                    with col1b:
-                        st.metric("湿度", f"{humidity:.1f}%", f"{random.uniform(-5, 5):.1f}")
-                    with col1c:
-                        st.metric("风速", f"{wind_speed:.1f}m/s", f"{random.uniform(-1, 1):.1f}")
-                
-                with col2:
-                    st.subheader("🌱 土壤数据")
-                    
-                    # 土壤数据
-                    soil_temp = 15 + 10 * random.random()
-                    soil_moisture = 30 + 40 * random.random()
-                    ph_value = 6.0 + 2 * random.random()
-                    
-                    col2a, col2b, col2c = st.columns(3)
-                    with col2a:
-                        st.metric("土壤温度", f"{soil_temp:.1f}°C", f"{random.uniform(-0.5, 0.5):.1f}")
-                    with col2b:
-                        st.metric("土壤湿度", f"{soil_moisture:.1f}%", f"{random.uniform(-2, 2):.1f}")
-                    with col2c:
-                        st.metric("pH值", f"{ph_value:.2f}", f"{random.uniform(-0.1, 0.1):.2f}")
-                
-                # 实时图表
-                st.subheader("📊 实时趋势")
-                
-                # 生成时间序列数据
-                times = [datetime.now() - timedelta(minutes=x) for x in range(30, 0, -1)]
-                temps = [20 + 5 * random.random() + 2 * random.random() for _ in times]
-                
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=times,
-                    y=temps,
-                    mode='lines+markers',
-                    name='温度',
-                    line=dict(color='#EF4444', width=3)
-                ))
-                
-                fig.update_layout(
-                    title="实时温度变化",
-                    xaxis_title="时间",
-                    yaxis_title="温度 (°C)",
-                    height=300
-                )
-                
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # 状态信息
-                st.info(f"🔄 数据更新时间: {datetime.now().strftime('%H:%M:%S')} | 连接状态: ✅ 正常")
-            
-            # 等待1秒后更新
-            time.sleep(1)
+        render_realtime_panel()
     else:
         st.info("实时更新已暂停。勾选上方复选框以启用实时数据流。")
 
+REALTIME_HISTORY_LIMIT = 3600  # 实时趋势最多保留的数据点数
+
+@st.fragment(run_every="1s")
+def render_realtime_panel():
+    """实时数据面板，每秒只重跑本片段，不阻塞整个页面脚本"""
+    # 本次刷新所需的随机数一次生成: 6个读数 + 6个变化量
+    temp, humidity, wind_speed, soil_temp, soil_moisture, ph_value = (
+        _rng.uniform([20, 40, 0, 15, 30, 6.0], [30, 80, 15, 25, 70, 8.0]).tolist()
+    )
+    deltas = (_rng.uniform(-1, 1, 6) * np.array([1, 5, 1, 0.5, 2, 0.1])).tolist()
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("🌤️ 气象数据")
+        
+        # 显示实时数值
+        col1a, col1b, col1c = st.columns(3)
+        with col1a:
+            st.metric("温度", f"{temp:.1f}°C", f"{deltas[0]:.1f}")
+        with col1b:
+            st.metric("湿度", f"{humidity:.1f}%", f"{deltas[1]:.1f}")
+        with col1c:
+            st.metric("风速", f"{wind_speed:.1f}m/s", f"{deltas[2]:.1f}")
+    
+    with col2:
+        st.subheader("🌱 土壤数据")
+        
+        col2a, col2b, col2c = st.columns(3)
+        with col2a:
+            st.metric("土壤温度", f"{soil_temp:.1f}°C", f"{deltas[3]:.1f}")
+        with col2b:
+            st.metric("土壤湿度", f"{soil_moisture:.1f}%", f"{deltas[4]:.1f}")
+        with col2c:
+            st.metric("pH值", f"{ph_value:.2f}", f"{deltas[5]:.2f}")
+    
+    # 实时图表
+    st.subheader("📊 实时趋势")
+    
+    # 时间序列保存在 session_state 中，每次刷新只追加一个新点 (保留最近 REALTIME_HISTORY_LIMIT 个)
+    now = np.datetime64(datetime.now(), 'us')
+    new_temp = 20 + 5 * _rng.random() + 2 * _rng.random()
+    history = st.session_state.get('realtime_history')
+    if history is None:
+        times = now - np.arange(30, 0, -1) * np.timedelta64(1, 'm')
+        temps = 20 + 5 * _rng.random(30) + 2 * _rng.random(30)
+    else:
+        times = np.append(history[0], now)[-REALTIME_HISTORY_LIMIT:]
+        temps = np.append(history[1], new_temp)[-REALTIME_HISTORY_LIMIT:]
+    st.session_state['realtime_history'] = (times, temps)
+    
+    times, temps = lttb_downsample(times, temps)
+    
+    # 图表框架 (轨迹样式与布局) 只构建一次，之后每次刷新仅替换数据
+    fig = st.session_state.get('realtime_fig')
+    if fig is None:
+        fig = go.Figure()
+        fig.add_trace(go.Scattergl(
+            mode='lines+markers',
+            name='温度',
+            line=dict(color='#EF4444', width=3)
+        ))
+        
+        fig.update_layout(
+            title="实时温度变化",
+            xaxis_title="时间",
+            yaxis_title="温度 (°C)",
+            height=300,
+            uirevision="realtime"  # 数据刷新时保留用户的缩放/平移状态
+        )
+        st.session_state['realtime_fig'] = fig
+    
+    with fig.batch_update():
+        fig.data[0].x = times
+        fig.data[0].y = temps
+    
+    st.plotly_chart(fig, use_container_width=True, key="realtime_trend")
+    
+    # 状态信息
+    st.info(f"🔄 数据更新时间: {datetime.now().strftime('%H:%M:%S')} | 连接状态: ✅ 正常")
+
+# Fork演示页的静态表格数据
+HISTORY_DATA = [
+    {"时间": "2024-08-14 16:45", "操作": "Fork项目", "用户": "您", "描述": "从expert_farmer的项目创建Fork"},
+    {"时间": "2024-08-14 16:47", "操作": "修改配置", "用户": "您", "描述": "添加光照传感器图表"},
+    {"时间": "2024-08-14 16:50", "操作": "调整刷新", "用户": "您", "描述": "将刷新频率从10秒改为5秒"},
+]
+
+DIFF_DATA = [
+    {"字段": "project_name", "变更类型": "修改", "原值": "智能温室监控系统", "新值": "智能温室监控系统 (增强版)"},
+    {"字段": "charts", "变更类型": "添加", "原值": "2个图表", "新值": "4个图表 (+light, +co2)"},
+    {"字段": "refresh_interval", "变更类型": "修改", "原值": "10秒", "新值": "5秒"},
+    {"字段": "chart_type", "变更类型": "修改", "原值": "line", "新值": "area"},
+    {"字段": "color_scheme", "变更类型": "修改", "原值": "default", "新值": "green"}
+]
+
+# 配置对比的JSON文本，导入时序列化一次
+ORIGINAL_CONFIG_JSON = orjson.dumps({
+    "project_name": "智能温室监控系统",
+    "charts": ["temperature", "humidity"],
+    "refresh_interval": 10,
+    "alert_enabled": True,
+    "chart_type": "line",
+    "color_scheme": "default"
+}, option=orjson.OPT_INDENT_2).decode()
+
+FORKED_CONFIG_JSON = orjson.dumps({
+    "project_name": "智能温室监控系统 (增强版)",
+    "charts": ["temperature", "humidity", "light", "co2"],
+    "refresh_interval": 5,
+    "alert_enabled": True,
+    "chart_type": "area",
+    "color_scheme": "green"
+}, option=orjson.OPT_INDENT_2).decode()
+
+FORK_STATS = {
+    "总Fork数": 23,
+    "活跃Fork": 15,
+    "本月新增": 5,
+    "平均评分": 4.6
+}
+
+# Fork统计条: 一个HTML块代替逐项的列与指标组件
+FORK_STATS_HTML = (
+    '<div style="display: flex; gap: 1rem;">'
+    + "".join(
+        f'<div class="metric-card" style="flex: 1;">'
+        f'<div style="font-size: 0.875rem; color: #6B7280;">{escape(key)}</div>'
+        f'<div style="font-size: 2rem; font-weight: 600;">{escape(str(value))}</div>'
+        f'</div>'
+        for key, value in FORK_STATS.items()
+    )
+    + '</div>'
+)
+
+# 静态表格直接构建为Arrow表，渲染时跳过pandas转换
+HISTORY_TABLE = pa.Table.from_pylist(HISTORY_DATA)
+DIFF_TABLE = pa.Table.from_pylist(DIFF_DATA)
+
 def render_fork_demo():
     """渲染Fork功能演示"""
     st.header("🎯 Fork功能演示")
@@ -893,13 +1132,7 @@ def render_fork_demo():
             st.success("✅ 系统自动记录所有配置变更")
             
             st.markdown("**变更历史:**")
-            history_data = [
-                {"时间": "2024-08-14 16:45", "操作": "Fork项目", "用户": "您", "描述": "从expert_farmer的项目创建Fork"},
-                {"时间": "2024-08-14 16:47", "操作": "修改配置", "用户": "您", "描述": "添加光照传感器图表"},
-                {"时间": "2024-08-14 16:50", "操作": "调整刷新", "用户": "您", "描述": "将刷新频率从10秒改为5秒"},
-            ]
-            
-            st.dataframe(pd.DataFrame(history_data), use_container_width=True)
+            st.dataframe(HISTORY_TABLE, use_container_width=True, hide_index=True)
         
         elif step == 5:
             st.markdown("#### 步骤5: 分享和协作")
@@ -927,36 +1160,14 @@ def render_fork_demo():
         
         with col1:
             st.markdown("**原始配置**")
-            st.json({
-                "project_name": "智能温室监控系统",
-                "charts": ["temperature", "humidity"],
-                "refresh_interval": 10,
-                "alert_enabled": True,
-                "chart_type": "line",
-                "color_scheme": "default"
-            })
+            st.code(ORIGINAL_CONFIG_JSON, language='json')
         
         with col2:
             st.markdown("**修改后配置**")
-            st.json({
-                "project_name": "智能温室监控系统 (增强版)",
-                "charts": ["temperature", "humidity", "light", "co2"],
-                "refresh_interval": 5,
-                "alert_enabled": True,
-                "chart_type": "area",
-                "color_scheme": "green"
-            })
+            st.code(FORKED_CONFIG_JSON, language='json')
         
         st.markdown("### 📊 差异摘要")
-        diff_data = [
-            {"字段": "project_name", "变更类型": "修改", "原值": "智能温室监控系统", "新值": "智能温室监控系统 (增强版)"},
-            {"字段": "charts", "变更类型": "添加", "原值": "2个图表", "新值": "4个图表 (+light, +co2)"},
-            {"字段": "refresh_interval", "变更类型": "修改", "原值": "10秒", "新值": "5秒"},
-            {"字段": "chart_type", "变更类型": "修改", "原值": "line", "新值": "area"},
-            {"字段": "color_scheme", "变更类型": "修改", "原值": "default", "新值": "green"}
-        ]
-        
-        st.dataframe(pd.DataFrame(diff_data), use_container_width=True)
+        st.dataframe(DIFF_TABLE, use_container_width=True, hide_index=True)
     
     with tab3:
         st.subheader("📈 Fork网络图")
@@ -965,63 +1176,51 @@ def render_fork_demo():
         可视化项目的Fork关系网络，了解项目的传播和演化情况：
         """)
         
-        # 创建一个简单的网络图示意
-        fig = go.Figure()
-        
-        # 原始项目
-        fig.add_trace(go.Scatter(
-            x=[0], y=[0],
-            mode='markers+text',
-            marker=dict(size=30, color='#10B981'),
-            text=["原始项目"],
-            textposition="bottom center",
-            name="原始项目"
-        ))
-        
-        # Fork项目们
+        # 创建一个简单的网络图示意: 所有连线一条轨迹 (None分隔线段)，所有节点一条轨迹
         fork_positions = [(1, 0.5), (1, -0.5), (-1, 0.5), (-1, -0.5), (0, 1)]
         fork_names = ["Fork A", "Fork B", "Fork C", "Fork D", "Fork E"]
         
-        for i, (x, y) in enumerate(fork_positions):
-            fig.add_trace(go.Scatter(
-                x=[x], y=[y],
-                mode='markers+text',
-                marker=dict(size=20, color='#3B82F6'),
-                text=[fork_names[i]],
-                textposition="bottom center",
-                name=fork_names[i]
-            ))
-            
-            # 连接线
-            fig.add_trace(go.Scatter(
-                x=[0, x], y=[0, y],
-                mode='lines',
-                line=dict(color='#E5E7EB', width=2),
-                showlegend=False
-            ))
+        edge_x, edge_y = [], []
+        for x, y in fork_positions:
+            edge_x += [0, x, None]
+            edge_y += [0, y, None]
         
-        fig.update_layout(
-            title="项目Fork关系网络",
-            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            height=400,
-            showlegend=False
+        # 轨迹与布局一次性传入构造函数
+        fig = go.Figure(
+            data=[
+                # 连接线 (节点很少，用SVG渲染，不占用浏览器有限的WebGL上下文)
+                go.Scatter(
+                    x=edge_x, y=edge_y,
+                    mode='lines',
+                    line=dict(color='#E5E7EB', width=2),
+                    hoverinfo='skip'
+                ),
+                # 原始项目与Fork项目
+                go.Scatter(
+                    x=[0] + [x for x, _ in fork_positions],
+                    y=[0] + [y for _, y in fork_positions],
+                    mode='markers+text',
+                    marker=dict(
+                        size=[30] + [20] * len(fork_positions),
+                        color=['#10B981'] + ['#3B82F6'] * len(fork_positions)
+                    ),
+                    text=["原始项目"] + fork_names,
+                    textposition="bottom center"
+                ),
+            ],
+            layout=go.Layout(
+                title="项目Fork关系网络",
+                xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+                yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+                height=400,
+                showlegend=False
+            )
         )
         
         st.plotly_chart(fig, use_container_width=True)
         
         st.markdown("### 📊 Fork统计")
-        fork_stats = {
-            "总Fork数": 23,
-            "活跃Fork": 15,
-            "本月新增": 5,
-            "平均评分": 4.6
-        }
-        
-        cols = st.columns(len(fork_stats))
-        for i, (key, value) in enumerate(fork_stats.items()):
-            with cols[i]:
-                st.metric(key, value)
+        st.markdown(FORK_STATS_HTML, unsafe_allow_html=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
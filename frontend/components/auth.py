@@ -2,11 +2,51 @@
 认证组件 - 处理用户登录、注册等认证功能
 """
 
+import re
+import requests
 import streamlit as st
 import time
 from typing import Optional, Dict, Any
 from services.api_client import APIClient
 
+# 用户信息复核间隔（秒），期间的重跑直接信任会话中的认证状态
+AUTH_REVALIDATE_SECONDS = 30
+# 后端不可达时暂停复核的时长（秒）
+AUTH_OFFLINE_BACKOFF_SECONDS = 10
+
+# 注册校验用的预编译正则
+_EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+_PHONE_RE = re.compile(r"\d{11}", re.ASCII)
+
+# 演示账号
+DEMO_USERNAME = "18823870097"
+DEMO_PASSWORD = "yaohongming"
+
+# 登出时清除的会话状态键
+_SESSION_KEYS_TO_CLEAR = (
+    'authenticated', 'user_info', 'access_token',
+    'current_page', 'selected_devices', '_auth_verified_at',
+    '_auth_offline_until'
+)
+
+# 登录页静态HTML片段，导入时构建一次
+_LOGIN_HEADER_HTML = """
+<div style="text-align: center; padding: 2rem 0;">
+    <h1>🌱 农业物联网可视化平台</h1>
+    <p style="color: #6B7280; font-size: 1.1rem;">现代化IoT数据分析与可视化系统</p>
+</div>
+"""
+
+_DEMO_HINT_HTML = f"""
+<div style="margin-top: 2rem; padding: 1rem; background: #F0FDF4; border: 1px solid #D1FAE5; border-radius: 8px;">
+    <h4 style="color: #065F46; margin-bottom: 0.5rem;">演示账号</h4>
+    <p style="color: #047857; margin: 0;">
+        用户名：<code>{DEMO_USERNAME}</code><br>
+        密码：<code>{DEMO_PASSWORD}</code>
+    </p>
+</div>
+"""
+
 class AuthManager:
     """认证管理器"""
     
@@ -16,12 +56,7 @@ class AuthManager:
     
     def render_login_page(self):
         """渲染登录页面"""
-        st.markdown("""
-        <div style="text-align: center; padding: 2rem 0;">
-            <h1>🌱 农业物联网可视化平台</h1>
-            <p style="color: #6B7280; font-size: 1.1rem;">现代化IoT数据分析与可视化系统</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_LOGIN_HEADER_HTML, unsafe_allow_html=True)
         
         # 创建居中的登录表单
         col1, col2, col3 = st.columns([1, 2, 1])
@@ -82,21 +117,13 @@ class AuthManager:
         if login_clicked or demo_clicked:
             if demo_clicked:
                 # 使用演示账号
-                username = "18823870097"
-                password = "yaohongming"
+                username = DEMO_USERNAME
+                password = DEMO_PASSWORD
             
             self._handle_login(username, password, remember_me)
         
         # 显示提示信息
-        st.markdown("""
-        <div style="margin-top: 2rem; padding: 1rem; background: #F0FDF4; border: 1px solid #D1FAE5; border-radius: 8px;">
-            <h4 style="color: #065F46; margin-bottom: 0.5rem;">演示账号</h4>
-            <p style="color: #047857; margin: 0;">
-                用户名：<code>18823870097</code><br>
-                密码：<code>yaohongming</code>
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_DEMO_HINT_HTML, unsafe_allow_html=True)
     
     def _render_register_tab(self):
         """渲染注册标签页"""
@@ -177,16 +204,16 @@ class AuthManager:
                     st.session_state.user_info = user_data['user']
                     st.session_state.access_token = user_data['access_token']
                     
-                    # 显示成功消息
-                    st.success(f"欢迎回来，{user_data['user']['username']}！")
+                    st.session_state._auth_verified_at = time.time()
+                    
+                    # 显示成功消息（toast在重跑后仍会显示）
+                    st.toast(f"欢迎回来，{user_data['user']['username']}！", icon="✅")
                     
                     # 记住登录状态
                     if remember_me:
                         # 这里可以实现持久化存储
                         pass
                     
-                    # 延迟后刷新页面
-                    time.sleep(1)
                     st.rerun()
                     
                 else:
@@ -222,10 +249,9 @@ class AuthManager:
                 
                 if response.get('status') == 1:
                     # 注册成功
-                    st.success("注册成功！请使用新账号登录。")
+                    st.toast("注册成功！请使用新账号登录。", icon="✅")
                     
                     # 切换到登录标签页（这里可以通过session state实现）
-                    time.sleep(2)
                     st.rerun()
                     
                 else:
@@ -268,12 +294,12 @@ class AuthManager:
             return False
         
         # 检查邮箱格式
-        if email and '@' not in email:
+        if email and not _EMAIL_RE.fullmatch(email):
             st.error("邮箱格式不正确")
             return False
         
         # 检查手机号格式（简单验证）
-        if phone and (not phone.isdigit() or len(phone) != 11):
+        if phone and not _PHONE_RE.fullmatch(phone):
             st.error("手机号格式不正确")
             return False
         
@@ -292,19 +318,30 @@ class AuthManager:
         # 设置API客户端的token
         self.api_client.set_auth_token(token)
         
-        # 可以在这里添加token有效性检查
+        # 短时间内已校验过，或后端刚刚不可达，则跳过网络请求
+        now = time.time()
+        if now - st.session_state.get('_auth_verified_at', 0) < AUTH_REVALIDATE_SECONDS:
+            return True
+        if now < st.session_state.get('_auth_offline_until', 0):
+            return True
+        
         try:
             user_info = self.api_client.get_user_info()
             if user_info.get('status') == 1:
                 # 更新用户信息
                 st.session_state.user_info = user_info['data']
+                st.session_state._auth_verified_at = now
                 return True
             else:
                 # Token无效，清除认证状态
                 self.logout()
                 return False
-        except:
-            # API调用失败，可能是网络问题，暂时保持认证状态
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            # 网络问题，暂时保持认证状态，并在一段时间内不再重试
+            st.session_state._auth_offline_until = now + AUTH_OFFLINE_BACKOFF_SECONDS
+            return True
+        except requests.exceptions.RequestException:
+            # 其他API调用失败，暂时保持认证状态
             return True
     
     def logout(self):
@@ -316,14 +353,8 @@ class AuthManager:
             pass  # 即使后端登出失败也要清除本地状态
         
         # 清除会话状态
-        keys_to_clear = [
-            'authenticated', 'user_info', 'access_token',
-            'current_page', 'selected_devices'
-        ]
-        
-        for key in keys_to_clear:
-            if key in st.session_state:
-                del st.session_state[key]
+        for key in _SESSION_KEYS_TO_CLEAR:
+            st.session_state.pop(key, None)
     
     def get_current_user(self) -> Optional[Dict[str, Any]]:
         """获取当前用户信息"""
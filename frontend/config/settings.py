@@ -3,10 +3,108 @@
 """
 
 import os
+import sys
 from typing import Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from urllib.parse import urlsplit, urlunsplit
 
-@dataclass
+# 静态查找表在模块加载时构建一次，各方法直接返回共享实例
+# 设备类型ID为连续整数1-13，按ID直接索引元组 (下标0占位)
+# 设备类型名称
+_DEVICE_TYPE_NAME_TABLE = (
+    "",
+    "气象站",
+    "土壤墒情",
+    "水质监测",
+    "视频监控",
+    "配电柜",
+    "虫情监测",
+    "孢子仪",
+    "环境监测",
+    "智能灌溉",
+    "杀虫灯",
+    "一体化闸门",
+    "积水传感器",
+    "植物生长记录仪",
+)
+
+# 设备类型图标
+_DEVICE_TYPE_ICON_TABLE = (
+    "",
+    "🌤️",   # 气象站
+    "🌱",   # 土壤墒情
+    "💧",   # 水质监测
+    "📹",   # 视频监控
+    "⚡",   # 配电柜
+    "🐛",   # 虫情监测
+    "🦠",   # 孢子仪
+    "🌡️",   # 环境监测
+    "💦",   # 智能灌溉
+    "💡",   # 杀虫灯
+    "🚪",   # 一体化闸门
+    "🌊",   # 积水传感器
+    "📊",   # 植物生长记录仪
+)
+
+# 设备类型颜色
+_DEVICE_TYPE_COLOR_TABLE = (
+    "",
+    "#3B82F6",   # 蓝色
+    "#10B981",   # 绿色
+    "#06B6D4",   # 青色
+    "#8B5CF6",   # 紫色
+    "#F59E0B",   # 橙色
+    "#EF4444",   # 红色
+    "#84CC16",   # 浅绿色
+    "#6366F1",   # 靛色
+    "#14B8A6",   # 青绿色
+    "#F97316",   # 深橙色
+    "#64748B",   # 灰色
+    "#0EA5E9",   # 天蓝色
+    "#22C55E",   # 绿色
+)
+
+def _id_mapping(table: tuple) -> MappingProxyType:
+    """由按ID索引的元组构建只读字典 (兼容按字典访问的调用方)"""
+    return MappingProxyType({type_id: value for type_id, value in enumerate(table) if type_id})
+
+_DEVICE_TYPE_NAMES = _id_mapping(_DEVICE_TYPE_NAME_TABLE)
+_DEVICE_TYPE_ICONS = _id_mapping(_DEVICE_TYPE_ICON_TABLE)
+_DEVICE_TYPE_COLORS = _id_mapping(_DEVICE_TYPE_COLOR_TABLE)
+
+# 图表默认配置 (共享实例，调用方不应修改)
+_CHART_CONFIG = {
+    'displayModeBar': True,
+    'displaylogo': False,
+    'modeBarButtonsToRemove': [
+        'pan2d', 'lasso2d', 'select2d', 'autoScale2d',
+        'hoverClosestCartesian', 'hoverCompareCartesian',
+        'toggleSpikelines'
+    ],
+    'toImageButtonOptions': {
+        'format': 'png',
+        'filename': 'iot_chart',
+        'height': 600,
+        'width': 1000,
+        'scale': 2
+    },
+    'responsive': True
+}
+
+# 地图默认配置 (共享实例，调用方不应修改)
+_MAP_CONFIG = {
+    'scrollWheelZoom': True,
+    'doubleClickZoom': True,
+    'dragging': True,
+    'zoomControl': True,
+    'attributionControl': True
+}
+
+# dataclass的slots参数需Python 3.10+，3.9上退化为普通dataclass (带默认值的字段无法手写__slots__)
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_SLOTS)
 class Settings:
     """应用设置类"""
     
@@ -14,6 +112,7 @@ class Settings:
     API_BASE_URL: str = os.getenv("API_BASE_URL", "http://localhost:8080")
     API_VERSION: str = "v1"
     WEBSOCKET_URL: str = None
+    API_URL: str = field(default=None, init=False)  # 由__post_init__构建
     
     # 前端配置
     PAGE_TITLE: str = "农业物联网可视化平台"
@@ -51,7 +150,7 @@ class Settings:
     
     # 文件上传设置
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
-    ALLOWED_FILE_TYPES: list = ['.csv', '.json', '.xlsx']
+    ALLOWED_FILE_TYPES: frozenset = frozenset({'.csv', '.json', '.xlsx'})
     
     # 分页设置
     DEFAULT_PAGE_SIZE: int = 20
@@ -63,15 +162,19 @@ class Settings:
     
     def __post_init__(self):
         """初始化后处理"""
+        # 只解析一次基础URL，保留主机端口与路径前缀
+        parts = urlsplit(self.API_BASE_URL)
+        base_path = parts.path.rstrip("/")
+        
         # 构建WebSocket URL
         if not self.WEBSOCKET_URL:
-            ws_protocol = "ws" if self.API_BASE_URL.startswith("http://") else "wss"
-            ws_host = self.API_BASE_URL.replace("http://", "").replace("https://", "")
-            self.WEBSOCKET_URL = f"{ws_protocol}://{ws_host}/api/{self.API_VERSION}/ws"
+            ws_scheme = "wss" if parts.scheme == "https" else "ws"
+            self.WEBSOCKET_URL = urlunsplit(
+                (ws_scheme, parts.netloc, f"{base_path}/api/{self.API_VERSION}/ws", "", "")
+            )
         
         # 构建完整的API URL
-        if not self.API_BASE_URL.endswith("/"):
-            self.API_BASE_URL += "/"
+        self.API_BASE_URL = urlunsplit((parts.scheme, parts.netloc, f"{base_path}/", "", ""))
         self.API_URL = f"{self.API_BASE_URL}api/{self.API_VERSION}"
     
     @property
@@ -86,87 +189,35 @@ class Settings:
     
     def get_device_type_names(self) -> dict:
         """获取设备类型名称映射"""
-        return {
-            1: "气象站",
-            2: "土壤墒情",
-            3: "水质监测", 
-            4: "视频监控",
-            5: "配电柜",
-            6: "虫情监测",
-            7: "孢子仪",
-            8: "环境监测",
-            9: "智能灌溉",
-            10: "杀虫灯",
-            11: "一体化闸门",
-            12: "积水传感器",
-            13: "植物生长记录仪"
-        }
+        return _DEVICE_TYPE_NAMES
     
     def get_device_type_icons(self) -> dict:
         """获取设备类型图标"""
-        return {
-            1: "🌤️",   # 气象站
-            2: "🌱",   # 土壤墒情
-            3: "💧",   # 水质监测
-            4: "📹",   # 视频监控
-            5: "⚡",   # 配电柜
-            6: "🐛",   # 虫情监测
-            7: "🦠",   # 孢子仪
-            8: "🌡️",   # 环境监测
-            9: "💦",   # 智能灌溉
-            10: "💡",  # 杀虫灯
-            11: "🚪",  # 一体化闸门
-            12: "🌊",  # 积水传感器
-            13: "📊"   # 植物生长记录仪
-        }
+        return _DEVICE_TYPE_ICONS
     
     def get_device_type_colors(self) -> dict:
         """获取设备类型颜色"""
-        return {
-            1: "#3B82F6",   # 蓝色
-            2: "#10B981",   # 绿色
-            3: "#06B6D4",   # 青色
-            4: "#8B5CF6",   # 紫色
-            5: "#F59E0B",   # 橙色
-            6: "#EF4444",   # 红色
-            7: "#84CC16",   # 浅绿色
-            8: "#6366F1",   # 靛色
-            9: "#14B8A6",   # 青绿色
-            10: "#F97316",  # 深橙色
-            11: "#64748B",  # 灰色
-            12: "#0EA5E9",  # 天蓝色
-            13: "#22C55E"   # 绿色
-        }
+        return _DEVICE_TYPE_COLORS
+    
+    def device_type_name(self, type_id: int) -> str:
+        """按ID获取设备类型名称"""
+        return _DEVICE_TYPE_NAME_TABLE[type_id]
+    
+    def device_type_icon(self, type_id: int) -> str:
+        """按ID获取设备类型图标"""
+        return _DEVICE_TYPE_ICON_TABLE[type_id]
+    
+    def device_type_color(self, type_id: int) -> str:
+        """按ID获取设备类型颜色"""
+        return _DEVICE_TYPE_COLOR_TABLE[type_id]
     
     def get_chart_config(self) -> dict:
         """获取图表默认配置"""
-        return {
-            'displayModeBar': True,
-            'displaylogo': False,
-            'modeBarButtonsToRemove': [
-                'pan2d', 'lasso2d', 'select2d', 'autoScale2d',
-                'hoverClosestCartesian', 'hoverCompareCartesian',
-                'toggleSpikelines'
-            ],
-            'toImageButtonOptions': {
-                'format': 'png',
-                'filename': 'iot_chart',
-                'height': 600,
-                'width': 1000,
-                'scale': 2
-            },
-            'responsive': True
-        }
+        return _CHART_CONFIG
     
     def get_map_config(self) -> dict:
         """获取地图默认配置"""
-        return {
-            'scrollWheelZoom': True,
-            'doubleClickZoom': True,
-            'dragging': True,
-            'zoomControl': True,
-            'attributionControl': True
-        }
+        return _MAP_CONFIG
     
     def validate(self) -> bool:
         """验证设置"""
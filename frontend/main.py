@@ -4,11 +4,8 @@
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import time
+import streamlit.components.v1 as components
+import os
 
 # 页面配置
 st.set_page_config(
@@ -20,7 +17,7 @@ st.set_page_config(
 
 # 导入自定义模块
 from config.settings import Settings
-from services.api_client import APIClient
+from services.api_client import get_api_client
 from components.auth import AuthManager
 from components.sidebar import render_sidebar
 from components.dashboard import render_dashboard
@@ -28,314 +25,23 @@ from components.devices import render_device_management
 from components.projects import render_project_management
 from components.realtime import render_realtime_data
 from utils.cache import cache_manager
+from utils.cache_stats import render_cache_stats
 from utils.websocket_client import WebSocketManager
 
 # 初始化设置
 settings = Settings()
-api_client = APIClient(settings.API_BASE_URL)
+api_client = get_api_client(settings.API_BASE_URL)  # 所有会话共享同一客户端，令牌取自各会话的session_state
+
+# 自定义CSS样式 (样式表位于 static/theme.css，导入时读取一次)
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'theme.css'), encoding='utf-8') as _css_file:
+    _CUSTOM_CSS_HTML = f"<style>\n{_css_file.read()}</style>"
 
-# 自定义CSS样式
 def load_custom_css():
-    """加载自定义CSS样式"""
-    st.markdown("""
-    <style>
-    /* 主题色彩 - 农业绿色主题 */
-    :root {
-        --primary-color: #10B981;
-        --secondary-color: #059669;
-        --accent-color: #34D399;
-        --background-color: #F0FDF4;
-        --text-color: #1F2937;
-        --border-color: #E5E7EB;
-        --success-color: #10B981;
-        --warning-color: #F59E0B;
-        --error-color: #EF4444;
-        --info-color: #3B82F6;
-    }
-    
-    /* 全局样式 */
-    .main .block-container {
-        padding-top: 2rem;
-        padding-bottom: 2rem;
-    }
-    
-    /* 卡片样式 */
-    .metric-card {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 12px;
-        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-        border: 1px solid var(--border-color);
-        transition: transform 0.2s ease, box-shadow 0.2s ease;
-        margin-bottom: 1rem;
-    }
-    
-    .metric-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 8px 15px -3px rgba(0, 0, 0, 0.1);
-    }
-    
-    /* 设备状态指示器 */
-    .device-status {
-        display: inline-flex;
-        align-items: center;
-        padding: 0.25rem 0.75rem;
-        border-radius: 9999px;
-        font-size: 0.875rem;
-        font-weight: 500;
-        margin-right: 0.5rem;
-    }
-    
-    .status-online {
-        background-color: #D1FAE5;
-        color: #065F46;
-        border: 1px solid #A7F3D0;
-    }
-    
-    .status-offline {
-        background-color: #FEE2E2;
-        color: #991B1B;
-        border: 1px solid #FECACA;
-    }
-    
-    .status-error {
-        background-color: #FEF3C7;
-        color: #92400E;
-        border: 1px solid #FDE68A;
-    }
-    
-    /* 脉搏动画 */
-    @keyframes pulse {
-        0%, 100% { opacity: 1; }
-        50% { opacity: 0.5; }
-    }
-    
-    .pulse {
-        animation: pulse 2s infinite;
-    }
-    
-    /* 导航标签样式 */
-    .nav-tab {
-        background: white;
-        border: 1px solid var(--border-color);
-        border-radius: 8px;
-        padding: 0.75rem 1.5rem;
-        margin: 0.25rem;
-        text-align: center;
-        cursor: pointer;
-        transition: all 0.2s ease;
-    }
-    
-    .nav-tab:hover {
-        background: var(--background-color);
-        border-color: var(--primary-color);
-    }
-    
-    .nav-tab.active {
-        background: var(--primary-color);
-        color: white;
-        border-color: var(--primary-color);
-    }
-    
-    /* 数据卡片 */
-    .data-card {
-        background: linear-gradient(135deg, var(--primary-color), var(--secondary-color));
-        color: white;
-        padding: 1.5rem;
-        border-radius: 12px;
-        box-shadow: 0 4px 6px -1px rgba(16, 185, 129, 0.3);
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .data-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        right: 0;
-        width: 100px;
-        height: 100px;
-        background: rgba(255, 255, 255, 0.1);
-        border-radius: 50%;
-        transform: translate(30%, -30%);
-    }
-    
-    .data-value {
-        font-size: 2.5rem;
-        font-weight: bold;
-        margin-bottom: 0.5rem;
-        position: relative;
-        z-index: 1;
-    }
-    
-    .data-label {
-        font-size: 1rem;
-        opacity: 0.9;
-        position: relative;
-        z-index: 1;
-    }
-    
-    /* 项目卡片 */
-    .project-card {
-        background: white;
-        border: 1px solid var(--border-color);
-        border-radius: 12px;
-        padding: 1.5rem;
-        margin-bottom: 1rem;
-        transition: all 0.2s ease;
-        position: relative;
-    }
-    
-    .project-card:hover {
-        border-color: var(--primary-color);
-        box-shadow: 0 8px 15px -3px rgba(0, 0, 0, 0.1);
-    }
-    
-    .project-title {
-        font-size: 1.25rem;
-        font-weight: 600;
-        color: var(--text-color);
-        margin-bottom: 0.5rem;
-    }
-    
-    .project-description {
-        color: #6B7280;
-        font-size: 0.875rem;
-        margin-bottom: 1rem;
-        line-height: 1.5;
-    }
+    """加载自定义CSS样式
     
-    .project-stats {
-        display: flex;
-        align-items: center;
-        gap: 1rem;
-        font-size: 0.875rem;
-        color: #6B7280;
-    }
-    
-    .project-tag {
-        display: inline-block;
-        background: var(--background-color);
-        color: var(--primary-color);
-        padding: 0.25rem 0.75rem;
-        border-radius: 9999px;
-        font-size: 0.75rem;
-        font-weight: 500;
-        margin-right: 0.5rem;
-        margin-bottom: 0.5rem;
-        border: 1px solid #D1FAE5;
-    }
-    
-    /* Fork按钮样式 */
-    .fork-button {
-        background: var(--primary-color);
-        color: white;
-        border: none;
-        padding: 0.5rem 1rem;
-        border-radius: 6px;
-        font-size: 0.875rem;
-        font-weight: 500;
-        cursor: pointer;
-        transition: all 0.2s ease;
-        position: absolute;
-        top: 1rem;
-        right: 1rem;
-    }
-    
-    .fork-button:hover {
-        background: var(--secondary-color);
-        transform: translateY(-1px);
-    }
-    
-    /* 响应式设计 */
-    @media (max-width: 768px) {
-        .metric-card {
-            padding: 1rem;
-        }
-        
-        .data-value {
-            font-size: 2rem;
-        }
-        
-        .project-card {
-            padding: 1rem;
-        }
-        
-        .fork-button {
-            position: static;
-            margin-top: 1rem;
-            width: 100%;
-        }
-    }
-    
-    /* Plotly图表样式调整 */
-    .js-plotly-plot .plotly .modebar {
-        background-color: rgba(255, 255, 255, 0.8);
-        border-radius: 6px;
-    }
-    
-    /* 隐藏Streamlit默认元素 */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    /* 侧边栏样式 */
-    .sidebar .sidebar-content {
-        background: linear-gradient(180deg, #F0FDF4 0%, #ECFDF5 100%);
-        border-right: 1px solid var(--border-color);
-    }
-    
-    /* 加载动画 */
-    .loading-spinner {
-        display: inline-block;
-        width: 20px;
-        height: 20px;
-        border: 3px solid #f3f3f3;
-        border-top: 3px solid var(--primary-color);
-        border-radius: 50%;
-        animation: spin 1s linear infinite;
-        margin-right: 0.5rem;
-    }
-    
-    @keyframes spin {
-        0% { transform: rotate(0deg); }
-        100% { transform: rotate(360deg); }
-    }
-    
-    /* 通知样式 */
-    .notification {
-        padding: 1rem;
-        border-radius: 8px;
-        margin-bottom: 1rem;
-        border: 1px solid;
-        position: relative;
-    }
-    
-    .notification-success {
-        background: #D1FAE5;
-        border-color: #A7F3D0;
-        color: #065F46;
-    }
-    
-    .notification-warning {
-        background: #FEF3C7;
-        border-color: #FDE68A;
-        color: #92400E;
-    }
-    
-    .notification-error {
-        background: #FEE2E2;
-        border-color: #FECACA;
-        color: #991B1B;
-    }
-    
-    .notification-info {
-        background: #DBEAFE;
-        border-color: #BFDBFE;
-        color: #1E40AF;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    每次重跑都需输出: Streamlit会移除本次运行未再生成的元素，只在首次运行输出会使样式丢失
+    """
+    st.markdown(_CUSTOM_CSS_HTML, unsafe_allow_html=True)
 
 def main():
     """主函数"""
@@ -353,7 +59,7 @@ def main():
     # 认证检查
     auth_manager = AuthManager(api_client)
     
-    if not st.session_state.authenticated:
+    if not auth_manager.check_authentication():
         # 显示登录页面
         auth_manager.render_login_page()
         return
@@ -387,6 +93,28 @@ def render_authenticated_app():
             render_analytics_page()
         elif current_page == 'settings':
             render_settings_page()
+    
+    # 调试: URL带 ?debug=cache 时显示缓存统计面板
+    if st.query_params.get('debug') == 'cache':
+        render_cache_stats(expanded=True)
+
+# 页头时钟: 在浏览器中按 YYYY-MM-DD HH:MM:SS 格式每秒更新
+_CLOCK_HTML = """
+<div style="font-family: sans-serif; font-size: 1rem; color: #1F2937;">
+    <b>当前时间:</b> <span id="clock"></span>
+</div>
+<script>
+const pad = (n) => String(n).padStart(2, "0");
+const tick = () => {
+    const d = new Date();
+    document.getElementById("clock").textContent =
+        `${d.getFullYear()}-${pad(d.getMonth() + 1)}-${pad(d.getDate())} ` +
+        `${pad(d.getHours())}:${pad(d.getMinutes())}:${pad(d.getSeconds())}`;
+};
+tick();
+setInterval(tick, 1000);
+</script>
+"""
 
 def render_header():
     """渲染页面头部"""
@@ -397,9 +125,8 @@ def render_header():
         st.markdown("*现代化IoT数据分析与可视化系统*")
     
     with col2:
-        # 实时时间显示
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        st.markdown(f"**当前时间:** {current_time}")
+        # 实时时间显示 (浏览器端每秒刷新，内容固定，重跑时无需下发新文本)
+        components.html(_CLOCK_HTML, height=32)
     
     with col3:
         # 用户信息和退出按钮
@@ -418,11 +145,9 @@ def logout():
         st.warning(f"登出时发生错误: {e}")
     
     # 清除会话状态
-    for key in list(st.session_state.keys()):
-        del st.session_state[key]
+    st.session_state.clear()
     
-    st.success("已成功退出登录")
-    time.sleep(1)
+    st.toast("已成功退出登录", icon="👋")
     st.rerun()
 
 def render_analytics_page():
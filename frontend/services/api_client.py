@@ -2,13 +2,78 @@
 API客户端 - 处理与后端Go Gin API的通信
 """
 
+from __future__ import annotations
+
+import socket
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 import streamlit as st
-from typing import Dict, List, Optional, Any, Union
-import json
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.cache_stats import tracked_cache
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import itertools
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Union
+import orjson
 from datetime import datetime, timedelta
 import time
 
+# pandas只在构建历史数据表时按需导入，避免拖慢应用冷启动
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 长连接的TCP保活参数: 空闲60秒后探测，避免池中连接被中间设备静默断开
+_KEEPALIVE_SOCKET_OPTIONS = HTTPConnection.default_socket_options + [
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+] + [
+    (socket.IPPROTO_TCP, getattr(socket, name), value)
+    for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 10), ('TCP_KEEPCNT', 3))
+    if hasattr(socket, name)
+]
+
+# 条件GET缓存的最大条目数
+ETAG_CACHE_SIZE = 128
+
+# 共享客户端实例的上限与存活时间（秒），被淘汰或过期的实例关闭其连接池
+API_CLIENT_CACHE_SIZE = 8
+API_CLIENT_TTL_SECONDS = 3600
+_client_epochs = itertools.count()
+
+# 预取请求用的线程池，所有客户端共享，首次使用时创建
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# 批量设备查询单次请求的设备数上限 (与后端maxBulkDevices一致)
+MAX_BULK_DEVICES = 500
+
+# 预取结果的有效期（秒），超时未被取用的视为过期并丢弃
+PREFETCH_MAX_AGE_SECONDS = 30
+
+# 写操作影响的GET缓存资源: 写入端点的首段 -> 需失效的端点首段 (未列出的只失效自身，auth不影响缓存)
+_INVALIDATED_RESOURCES = {
+    'auth': (),
+    'projects': ('projects', 'public'),
+}
+
+def _get_executor() -> ThreadPoolExecutor:
+    """返回共享线程池 (首次调用时创建)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='api-prefetch')
+        return _executor
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """启用TCP保活的连接池适配器"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = _KEEPALIVE_SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
 class APIClient:
     """API客户端类"""
     
@@ -24,69 +89,150 @@ class APIClient:
         self.session = requests.Session()
         self.timeout = 30
         
+        # 实例序号参与GET缓存键，过期重建的实例不会命中旧实例写入前的缓存条目
+        self._epoch = next(_client_epochs)
+        
+        # 连接池: 复用keep-alive连接，建立连接失败时幂等请求自动重试
+        # 不重试读取: 读超时为30秒，再试一次会让交互请求阻塞重跑约60秒
+        adapter = _KeepAliveAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, connect=2, read=0, backoff_factor=0.1,
+                              allowed_methods=frozenset({'GET', 'HEAD'}))
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # 条件GET缓存: (url, 参数, 令牌) -> (ETag, 响应数据)，LRU淘汰 (304时返回同一对象，调用方不应修改)
+        self._etag_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._etag_lock = threading.Lock()
+        
+        # 预取的GET请求: (端点, 参数, 令牌) -> (Future, 提交时刻)，由_cached_get在缓存未命中时取用
+        # 实例在重跑间共享，登录时发出的预取可被登录后下一次运行取用
+        self._prefetched: Dict[tuple, tuple] = {}
+        self._prefetch_lock = threading.Lock()
+        
+        # GET缓存的版本号: (端点首段, 令牌) -> 版本，写操作后更新使该用户的相关缓存条目失效
+        # 版本取自单调递增计数，LRU淘汰 (上限同ETag缓存)；无记录的键使用已淘汰的最大版本，淘汰后不会回到旧版本
+        self._cache_versions: "OrderedDict[tuple, int]" = OrderedDict()
+        self._cache_version_counter = itertools.count(1)
+        self._cache_version_floor = 0
+        self._cache_versions_lock = threading.Lock()
+        
         # 设置默认请求头
         self.session.headers.update({
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         })
     
-    def set_auth_token(self, token: str):
-        """设置认证令牌"""
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
+    
+    def set_auth_token(self, token: Optional[str]):
+        """设置当前会话的认证令牌
+        
+        实例由get_api_client在会话间共享，令牌保存在调用方会话的session_state中，而不是共享的请求头里
+        """
+        if get_script_run_ctx() is None:
+            return
         if token:
-            self.session.headers['Authorization'] = f'Bearer {token}'
+            st.session_state['access_token'] = token
         else:
-            self.session.headers.pop('Authorization', None)
+            st.session_state.pop('access_token', None)
+    
+    def _authorization(self) -> Optional[str]:
+        """当前会话的Authorization请求头，未登录或不在脚本运行线程中时为None"""
+        if get_script_run_ctx() is None:
+            return None
+        token = st.session_state.get('access_token')
+        return f'Bearer {token}' if token else None
     
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
+    def _make_request(self, method: str, endpoint: str, authorization: Optional[str] = None,
+                      **kwargs) -> Dict[str, Any]:
         """
         发送HTTP请求的通用方法
         
         Args:
             method: HTTP方法
             endpoint: API端点
+            authorization: 显式指定的Authorization请求头 (线程池中的预取使用)，默认取当前会话的令牌
             **kwargs: 其他请求参数
             
         Returns:
             API响应数据
         """
         url = f"{self.api_url}/{endpoint.lstrip('/')}"
+        authorization = authorization or self._authorization()
+        headers = dict(kwargs.pop('headers', None) or {})
+        if authorization:
+            headers['Authorization'] = authorization
+        
+        # GET请求携带上次的ETag，未变化时服务端返回304且不发送响应体
+        etag_key = cached = None
+        if method == 'GET':
+            params = kwargs.get('params')
+            etag_key = (url, tuple(sorted(params.items())) if params else (), authorization)
+            with self._etag_lock:
+                cached = self._etag_cache.get(etag_key)
+                if cached is not None:
+                    self._etag_cache.move_to_end(etag_key)
+            if cached is not None:
+                headers['If-None-Match'] = cached[0]
         
         try:
             response = self.session.request(
                 method=method,
                 url=url,
+                headers=headers,
                 timeout=self.timeout,
                 **kwargs
             )
-            
-            # 检查响应状态
-            if response.status_code == 401:
-                # 认证失败，清除token
-                self.set_auth_token(None)
-                if 'authenticated' in st.session_state:
-                    st.session_state.authenticated = False
-                raise requests.exceptions.HTTPError("认证失败，请重新登录")
-            
-            response.raise_for_status()
-            
-            # 解析JSON响应
-            try:
-                return response.json()
-            except json.JSONDecodeError:
-                return {'status': 1, 'data': response.text}
-                
         except requests.exceptions.ConnectionError:
             raise requests.exceptions.ConnectionError("无法连接到服务器，请检查网络连接")
         except requests.exceptions.Timeout:
             raise requests.exceptions.Timeout("请求超时，请稍后重试")
-        except requests.exceptions.HTTPError as e:
-            # 尝试解析错误响应
-            try:
-                error_data = response.json()
-                error_msg = error_data.get('error', str(e))
-            except:
-                error_msg = str(e)
-            raise requests.exceptions.HTTPError(f"HTTP错误 ({response.status_code}): {error_msg}")
+        
+        status_code = response.status_code
+        if status_code == 304 and cached is not None:
+            return cached[1]
+        
+        # 响应体只解析一次 (orjson直接解析字节)，成功与错误分支共用
+        try:
+            result = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            result = None
+        
+        # 检查响应状态
+        if status_code >= 400:
+            if status_code == 401:
+                # 认证失败，清除本会话的token；线程池中的预取没有会话上下文，只把错误交给_take_prefetched的取用方
+                if get_script_run_ctx() is not None:
+                    self.set_auth_token(None)
+                    if 'authenticated' in st.session_state:
+                        st.session_state.authenticated = False
+                default_msg = "认证失败，请重新登录"
+            else:
+                default_msg = f"{status_code} {response.reason}"
+            error_msg = result.get('error', default_msg) if isinstance(result, dict) else default_msg
+            raise requests.exceptions.HTTPError(f"HTTP错误 ({status_code}): {error_msg}", response=response)
+        
+        if result is None:
+            return {'status': 1, 'data': response.text}
+        
+        etag = response.headers.get('ETag')
+        if etag_key is not None and etag:
+            with self._etag_lock:
+                self._etag_cache[etag_key] = (etag, result)
+                self._etag_cache.move_to_end(etag_key)
+                if len(self._etag_cache) > ETAG_CACHE_SIZE:
+                    self._etag_cache.popitem(last=False)
+        return result
+    
+    @staticmethod
+    def _encode_body(data: Optional[Dict]) -> Optional[bytes]:
+        """用orjson编码请求体 (会话默认Content-Type已为application/json)"""
+        return None if data is None else orjson.dumps(data)
     
     def get(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """GET请求"""
@@ -94,15 +240,80 @@ class APIClient:
     
     def post(self, endpoint: str, data: Optional[Dict] = None) -> Dict[str, Any]:
         """POST请求"""
-        return self._make_request('POST', endpoint, json=data)
+        response = self._make_request('POST', endpoint, data=self._encode_body(data))
+        self._invalidate_cache(endpoint)
+        return response
     
     def put(self, endpoint: str, data: Optional[Dict] = None) -> Dict[str, Any]:
         """PUT请求"""
-        return self._make_request('PUT', endpoint, json=data)
+        response = self._make_request('PUT', endpoint, data=self._encode_body(data))
+        self._invalidate_cache(endpoint)
+        return response
     
     def delete(self, endpoint: str) -> Dict[str, Any]:
         """DELETE请求"""
-        return self._make_request('DELETE', endpoint)
+        response = self._make_request('DELETE', endpoint)
+        self._invalidate_cache(endpoint)
+        return response
+    
+    def cached_get(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """幂等GET请求，结果按端点、参数与当前令牌缓存 (TTL见_cached_get)"""
+        params_key = tuple(sorted(params.items())) if params else ()
+        authorization = self._authorization()
+        with self._cache_versions_lock:
+            version = self._cache_versions.get((self._resource_of(endpoint), authorization),
+                                               self._cache_version_floor)
+        return _cached_get(self, endpoint, params_key, authorization, (self._epoch, version))
+    
+    @staticmethod
+    def _resource_of(endpoint: str) -> str:
+        """端点所属的资源 (路径首段)"""
+        return endpoint.strip('/').split('/', 1)[0]
+    
+    def _invalidate_cache(self, endpoint: str):
+        """写操作后更新当前令牌下受影响资源的缓存版本，只影响该用户的这些端点"""
+        resource = self._resource_of(endpoint)
+        authorization = self._authorization()
+        affected_resources = _INVALIDATED_RESOURCES.get(resource, (resource,))
+        with self._cache_versions_lock:
+            for affected in affected_resources:
+                key = (affected, authorization)
+                self._cache_versions[key] = next(self._cache_version_counter)
+                self._cache_versions.move_to_end(key)
+            while len(self._cache_versions) > ETAG_CACHE_SIZE:
+                _, evicted = self._cache_versions.popitem(last=False)
+                self._cache_version_floor = max(self._cache_version_floor, evicted)
+        
+        # 写之前发出的预取结果同样已过时
+        with self._prefetch_lock:
+            for key in [k for k in self._prefetched
+                        if k[2] == authorization and self._resource_of(k[0]) in affected_resources]:
+                del self._prefetched[key]
+    
+    def prefetch(self, endpoint: str, params: Optional[Dict] = None):
+        """在线程池中提前发出GET请求，随后的cached_get缓存未命中时直接使用其结果"""
+        params_key = tuple(sorted(params.items())) if params else ()
+        authorization = self._authorization()
+        key = (endpoint, params_key, authorization)
+        future = _get_executor().submit(self._get_as, authorization, endpoint, params)
+        now = time.monotonic()
+        with self._prefetch_lock:
+            # 顺带清理从未被取用的过期预取，避免无限累积
+            for stale in [k for k, (_, at) in self._prefetched.items() if now - at > PREFETCH_MAX_AGE_SECONDS]:
+                del self._prefetched[stale]
+            self._prefetched[key] = (future, now)
+    
+    def _get_as(self, authorization: Optional[str], endpoint: str, params: Optional[Dict]) -> Dict[str, Any]:
+        """在线程池线程中以提交时的令牌发出GET请求 (工作线程没有会话上下文，令牌须显式传入)"""
+        return self._make_request('GET', endpoint, authorization=authorization, params=params)
+    
+    def _take_prefetched(self, key: tuple):
+        """取出 (并移除) 对应的预取请求，没有时返回None"""
+        with self._prefetch_lock:
+            entry = self._prefetched.pop(key, None)
+        if entry is None or time.monotonic() - entry[1] > PREFETCH_MAX_AGE_SECONDS:
+            return None
+        return entry[0]
     
     # 认证相关API
     def login(self, username: str, password: str) -> Dict[str, Any]:
@@ -114,11 +325,13 @@ class APIClient:
         
         response = self.post('auth/login', data)
         
-        # 登录成功后设置token
+        # 登录成功后设置token，并并发预取仪表板首屏需要的数据
         if response.get('status') == 1 and 'data' in response:
             token = response['data'].get('access_token')
             if token:
                 self.set_auth_token(token)
+                for endpoint in ('devices/types', 'devices/stats', 'public/stats'):
+                    self.prefetch(endpoint)
         
         return response
     
@@ -172,29 +385,129 @@ class APIClient:
         """删除设备"""
         return self.delete(f'devices/{device_id}')
     
+    def get_devices_bulk(self, ids: Optional[List[int]] = None,
+                         device_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """批量获取设备详情及最新数据 (按主键ID和/或设备唯一标识)
+        
+        后端单次最多MAX_BULK_DEVICES个，超出时分批请求并合并结果
+        """
+        ids = list(ids or [])
+        device_ids = list(device_ids or [])
+        batches = [
+            {'ids': ids[start:start + MAX_BULK_DEVICES], 'device_ids': []}
+            for start in range(0, len(ids), MAX_BULK_DEVICES)
+        ] + [
+            {'ids': [], 'device_ids': device_ids[start:start + MAX_BULK_DEVICES]}
+            for start in range(0, len(device_ids), MAX_BULK_DEVICES)
+        ]
+        if len(batches) <= 1:
+            body = batches[0] if batches else {'ids': [], 'device_ids': []}
+            # 只读查询，绕过post()以免使设备缓存失效
+            return self._make_request('POST', 'devices/bulk', data=self._encode_body(body))
+        
+        items = {}
+        for body in batches:
+            response = self._make_request('POST', 'devices/bulk', data=self._encode_body(body))
+            if response.get('status') != 1:
+                return response
+            for item in response.get('data') or []:
+                items[item['device']['id']] = item  # 同一设备可能同时按ID和设备标识命中
+        return {'status': 1, 'data': list(items.values())}
+    
     def get_device_types(self) -> Dict[str, Any]:
         """获取设备类型列表"""
-        return self.get('devices/types')
+        return self.cached_get('devices/types')
     
     def get_device_stats(self) -> Dict[str, Any]:
         """获取设备统计信息"""
-        return self.get('devices/stats')
+        return self.cached_get('devices/stats')
     
     def get_device_data(self, device_id: str) -> Dict[str, Any]:
         """获取设备实时数据"""
         return self.get(f'devices/{device_id}/data')
     
     def get_device_history(self, device_id: str, start_time: Optional[str] = None, 
-                          end_time: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
-        """获取设备历史数据"""
+                          end_time: Optional[str] = None, limit: int = 100,
+                          max_points: Optional[int] = None, field: Optional[str] = None,
+                          columnar: bool = False) -> Dict[str, Any]:
+        """获取设备历史数据
+        
+        max_points: 由后端降采样到的最大点数 (指定field时按该字段做LTTB，否则等间隔抽样)
+        columnar: 为True时data为列式结构 {'timestamp': [...], 'fields': {字段名: [...]}}
+        """
         params = {'limit': limit}
         if start_time:
             params['start_time'] = start_time
         if end_time:
             params['end_time'] = end_time
+        if max_points:
+            params['max_points'] = max_points
+            if field:
+                params['field'] = field
+        if columnar:
+            params['format'] = 'columnar'
         
         return self.get(f'devices/{device_id}/history', params)
     
+    def get_device_history_arrays(self, device_id: str, fields: List[str],
+                                  start_time: Optional[str] = None, end_time: Optional[str] = None,
+                                  limit: int = 100, max_points: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """以NDJSON流式读取设备历史数据，返回按时间升序的列数组
+        
+        边接收边解析，数值直接写入预分配的float数组，不构建逐行字典列表。
+        返回 {'timestamp': datetime64[ns]数组, 字段名: float64数组}，缺失值为NaN。
+        """
+        params = {'limit': limit, 'format': 'ndjson'}
+        if start_time:
+            params['start_time'] = start_time
+        if end_time:
+            params['end_time'] = end_time
+        if max_points:
+            params['max_points'] = max_points
+            params['field'] = fields[0] if fields else None
+        
+        capacity = min(limit, max_points) if max_points else limit
+        timestamps = []
+        columns = {field: np.full(capacity, np.nan) for field in fields}
+        
+        url = f"{self.api_url}/devices/{device_id}/history"
+        authorization = self._authorization()
+        headers = {'Authorization': authorization} if authorization else None
+        with self.session.get(url, params=params, headers=headers, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                if len(timestamps) == capacity:
+                    break
+                record = orjson.loads(line)
+                row = len(timestamps)
+                timestamps.append(record['t'])
+                data = record.get('d') or {}
+                for field, values in columns.items():
+                    value = data.get(field)
+                    if isinstance(value, (int, float)):
+                        values[row] = value
+        
+        import pandas as pd
+        
+        # 接口按时间倒序返回，反转视图得到升序 (不复制数据)
+        count = len(timestamps)
+        result = {
+            'timestamp': pd.to_datetime(timestamps, utc=True).to_numpy()[::-1]
+        }
+        for field, values in columns.items():
+            result[field] = values[:count][::-1]
+        return result
+    
+    def get_device_history_frame(self, device_id: str, start_time: Optional[str] = None,
+                                 end_time: Optional[str] = None, limit: int = 100) -> pd.DataFrame:
+        """获取设备历史数据的DataFrame (按时间升序索引，每个传感器字段一列)
+        
+        结果为跨重跑共享的同一对象，调用方只读使用，需修改时先 .copy()
+        """
+        return _history_frame(self, device_id, start_time, end_time, limit, self._authorization())
+    
     # 项目相关API
     def get_projects(self, page: int = 1, limit: int = 20, **filters) -> Dict[str, Any]:
         """获取项目列表"""
@@ -203,7 +516,7 @@ class APIClient:
             'limit': limit,
             **filters
         }
-        return self.get('projects', params)
+        return self.cached_get('projects', params)
     
     def get_project(self, project_id: int) -> Dict[str, Any]:
         """获取项目详情"""
@@ -236,11 +549,11 @@ class APIClient:
     # 公开API
     def get_public_projects(self) -> Dict[str, Any]:
         """获取公开项目列表"""
-        return self.get('public/projects')
+        return self.cached_get('public/projects')
     
     def get_public_stats(self) -> Dict[str, Any]:
         """获取公开统计信息"""
-        return self.get('public/stats')
+        return self.cached_get('public/stats')
     
     # 健康检查
     def health_check(self) -> Dict[str, Any]:
@@ -254,22 +567,28 @@ class APIClient:
     
     # 数据处理辅助方法
     def get_device_realtime_data(self, device_ids: List[str], max_points: int = 100) -> Dict[str, Any]:
-        """获取多个设备的实时数据"""
-        data = {}
+        """获取多个设备的实时数据 (单次批量请求)"""
+        if not device_ids:
+            return {}
         
-        for device_id in device_ids:
-            try:
-                response = self.get_device_data(device_id)
-                if response.get('status') == 1 and response.get('data'):
-                    data[device_id] = response['data']
-            except Exception as e:
-                st.warning(f"获取设备 {device_id} 数据失败: {e}")
-                continue
+        try:
+            response = self.get_devices_bulk(device_ids=list(device_ids))
+        except Exception as e:
+            st.warning(f"获取设备数据失败: {e}")
+            return {}
+        
+        if response.get('status') != 1:
+            return {}
         
-        return data
+        return {
+            item['device']['device_id']: item['latest_data']
+            for item in response.get('data') or []
+            if item.get('latest_data')
+        }
     
-    def get_device_history_range(self, device_id: str, days: int = 7) -> Dict[str, Any]:
-        """获取设备指定天数的历史数据"""
+    def get_device_history_range(self, device_id: str, days: int = 7, max_points: int = 1000,
+                                 field: Optional[str] = None) -> Dict[str, Any]:
+        """获取设备指定天数的历史数据 (后端读取至多10000条后降采样到max_points条)"""
         end_time = datetime.now()
         start_time = end_time - timedelta(days=days)
         
@@ -277,37 +596,114 @@ class APIClient:
             device_id=device_id,
             start_time=start_time.isoformat(),
             end_time=end_time.isoformat(),
-            limit=1000
+            limit=10000,
+            max_points=max_points,
+            field=field
         )
     
+    @staticmethod
+    def _parse_device_pk(device_id: Any) -> Optional[int]:
+        """将设备主键ID规范为int，非法 (非数字、带前导零等) 时返回None"""
+        if isinstance(device_id, int) and not isinstance(device_id, bool):
+            return device_id if device_id >= 0 else None
+        text = str(device_id)
+        if text.isascii() and text.isdigit() and str(int(text)) == text:
+            return int(text)
+        return None
+    
     def batch_get_device_stats(self, device_ids: List[str]) -> Dict[str, Any]:
-        """批量获取设备统计信息"""
-        stats = {}
-        
+        """批量获取设备统计信息 (单次批量请求，结果以传入的原始ID为键)"""
+        # 先校验并转换ID，非法ID按设备单独报错
+        pk_to_id = {}
         for device_id in device_ids:
-            try:
-                # 获取设备基本信息
-                device_info = self.get_device(device_id)
-                if device_info.get('status') == 1:
-                    device_data = device_info['data']
-                    
-                    # 获取最新数据
-                    latest_data = self.get_device_data(device_data['device_id'])
-                    
-                    stats[device_id] = {
-                        'device': device_data,
-                        'latest_data': latest_data.get('data') if latest_data.get('status') == 1 else None,
-                        'status': device_data.get('status', 'unknown'),
-                        'last_seen': device_data.get('last_seen')
-                    }
-            except Exception as e:
-                st.error(f"获取设备 {device_id} 统计信息失败: {e}")
+            pk = self._parse_device_pk(device_id)
+            if pk is None:
+                st.error(f"获取设备 {device_id} 统计信息失败: 无效的设备ID")
+            else:
+                pk_to_id[pk] = device_id
+        
+        if not pk_to_id:
+            return {}
+        
+        try:
+            response = self.get_devices_bulk(ids=list(pk_to_id))
+        except Exception as e:
+            st.error(f"批量获取设备统计信息失败: {e}")
+            return {}
+        
+        if response.get('status') != 1:
+            return {}
+        
+        stats = {}
+        for item in response.get('data') or []:
+            device_data = item['device']
+            device_id = pk_to_id.get(device_data['id'])
+            if device_id is None:
                 continue
+            stats[device_id] = {
+                'device': device_data,
+                'latest_data': item['latest_data'],
+                'status': device_data.get('status', 'unknown'),
+                'last_seen': device_data.get('last_seen')
+            }
         
-        return stats
+        # 保持传入顺序
+        return {device_id: stats[device_id] for device_id in device_ids if device_id in stats}
+
+@tracked_cache(st.cache_data(ttl=60, show_spinner=False),
+               name_of=lambda _client, endpoint, *args: f"GET {endpoint}")
+def _cached_get(_client: APIClient, endpoint: str, params: tuple, auth: Optional[str],
+                version: tuple) -> Dict[str, Any]:
+    """缓存的GET请求 (auth参与缓存键，不同用户的结果互不共享；version变化即视为失效)"""
+    # 登录时已预取的请求直接等待其结果
+    future = _client._take_prefetched((endpoint, params, auth))
+    if future is not None:
+        try:
+            return future.result()
+        except Exception:
+            pass  # 预取失败时重新请求，错误由下面的调用抛出
+    return _client.get(endpoint, dict(params) if params else None)
+
+@tracked_cache(st.cache_resource(ttl=30, show_spinner=False))
+def _history_frame(_client: APIClient, device_id: str, start_time: Optional[str],
+                   end_time: Optional[str], limit: int, auth: Optional[str]) -> pd.DataFrame:
+    """缓存的历史数据表 (cache_resource命中时不做复制，返回共享对象)"""
+    import pandas as pd
+    
+    response = _client.get_device_history(device_id, start_time, end_time, limit, columnar=True)
+    history = (response.get('data') or {}) if response.get('status') == 1 else {}
+    
+    # 列式响应直接按列构建，不生成逐行字典
+    frame = pd.DataFrame(
+        history.get('fields') or {},
+        index=pd.DatetimeIndex(history.get('timestamp') or [], name='timestamp')
+    )
+    return frame.sort_index()
+
+# 全局API客户端实例: base_url -> (客户端, 创建时刻)，LRU淘汰
+_api_clients: "OrderedDict[str, tuple]" = OrderedDict()
+_api_clients_lock = threading.Lock()
 
-# 创建全局API客户端实例（用于缓存）
-@st.cache_resource
 def get_api_client(base_url: str) -> APIClient:
-    """获取API客户端实例（缓存）"""
-    return APIClient(base_url)
\ No newline at end of file
+    """获取API客户端实例（按base_url在所有会话间共享连接池、ETag与预取状态）
+    
+    最多保留API_CLIENT_CACHE_SIZE个、API_CLIENT_TTL_SECONDS后重建，被淘汰的实例立即关闭连接池
+    """
+    now = time.monotonic()
+    evicted = []
+    with _api_clients_lock:
+        entry = _api_clients.get(base_url)
+        if entry is not None and now - entry[1] < API_CLIENT_TTL_SECONDS:
+            _api_clients.move_to_end(base_url)
+            return entry[0]
+        if entry is not None:
+            evicted.append(entry[0])
+        client = APIClient(base_url)
+        _api_clients[base_url] = (client, now)
+        _api_clients.move_to_end(base_url)
+        while len(_api_clients) > API_CLIENT_CACHE_SIZE:
+            evicted.append(_api_clients.popitem(last=False)[1][0])
+    
+    for old_client in evicted:
+        old_client.close()
+    return client
\ No newline at end of file
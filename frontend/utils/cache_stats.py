@@ -0,0 +1,75 @@
+"""
+缓存统计 - 记录 st.cache_data / st.cache_resource 的命中情况并提供诊断面板
+
+前端与根目录的 demo.py 共用本模块
+"""
+
+import functools
+import time
+from typing import Any, Dict
+
+import streamlit as st
+
+def _cache_counter(name: str) -> Dict[str, Any]:
+    """本会话中某个缓存入口的计数器"""
+    counters = st.session_state.setdefault('_cache_stats', {})
+    return counters.setdefault(name, {'calls': 0, 'misses': 0, 'miss_ms': 0.0})
+
+def tracked_cache(cache_decorator, name_of=None):
+    """包装 st.cache_data / st.cache_resource，在 session_state 中记录调用、未命中次数及未命中耗时
+    
+    name_of: 由调用参数得出统计名称 (默认为函数名)，用于按端点等维度分别统计
+    """
+    def decorator(func):
+        def stat_name(*args, **kwargs):
+            return name_of(*args, **kwargs) if name_of else func.__name__
+        
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            # 只有缓存未命中时函数体才会执行
+            counter = _cache_counter(stat_name(*args, **kwargs))
+            counter['misses'] += 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                counter['miss_ms'] += (time.perf_counter() - start) * 1000
+        
+        cached = cache_decorator(compute)
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            _cache_counter(stat_name(*args, **kwargs))['calls'] += 1
+            return cached(*args, **kwargs)
+        
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorator
+
+def render_cache_stats(expanded: bool = False):
+    """侧边栏缓存诊断面板: 各缓存入口在本会话中的命中/未命中次数与未命中耗时"""
+    import pandas as pd
+    
+    with st.sidebar.expander("🔬 缓存统计", expanded=expanded):
+        stats = st.session_state.get('_cache_stats', {})
+        if not stats:
+            st.caption("本会话尚未调用缓存函数")
+            return
+        
+        st.dataframe(pd.DataFrame([
+            {
+                "入口": name,
+                "调用": counter['calls'],
+                "命中": counter['calls'] - counter['misses'],
+                "未命中": counter['misses'],
+                "命中率": 100 * (counter['calls'] - counter['misses']) / counter['calls'] if counter['calls'] else 0,
+                "未命中耗时(ms)": round(counter['miss_ms'], 1),
+            }
+            for name, counter in stats.items()
+        ]).sort_values("未命中耗时(ms)", ascending=False),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "命中率": st.column_config.ProgressColumn("命中率", format="%.0f%%", min_value=0, max_value=100),
+            }
+        )